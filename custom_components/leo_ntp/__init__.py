@@ -1,21 +1,60 @@
 """LeoNTP integration."""
+import asyncio
+from collections.abc import Mapping
+import contextlib
+from dataclasses import asdict
 from datetime import timedelta
+import math
+import os
+import time
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers.update_coordinator import UpdateFailed
+import homeassistant.util.dt as dt_util
 
 from .client import LeoNtpClient
+from .client import TIMESTAMP_ITEM_TYPES
+from .client import LeoNtpFleetPoller
+from .const import CONF_ADAPTIVE_POLLING
+from .const import CONF_BURST_SIZE
+from .const import CONF_DEADBAND
+from .const import CONF_HEARTBEAT_INTERVAL
+from .const import CONF_MAX_UPDATE_INTERVAL
+from .const import CONF_MEASURE_OFFSET
+from .const import CONF_SAMPLE_INTERVAL
 from .const import CONF_UPDATE_INTERVAL
+from .const import DATA_FLEET_POLLER
+from .const import DEFAULT_ADAPTIVE_POLLING
+from .const import DEFAULT_BURST_SIZE
+from .const import DEFAULT_DEADBAND
+from .const import DEFAULT_HEARTBEAT_INTERVAL
+from .const import DEFAULT_MAX_UPDATE_INTERVAL
+from .const import DEFAULT_MEASURE_OFFSET
+from .const import DEFAULT_SAMPLE_INTERVAL
 from .const import DEFAULT_UPDATE_INTERVAL
 from .const import DOMAIN
+from .const import NAME
 from .const import PLATFORMS
+from .const import PORT
+from .const import STORAGE_SAVE_INTERVAL
+from .const import STORAGE_VERSION
 from .exceptions import LeoNtpException
 from .exceptions import LeoNtpServiceException
+from .history import LeoNtpWindowStats
 from .models import LeoNtpItem
+from .samples import LeoNtpSampleFile
+from .samples import sample_file_capacity
+from .scheduler import LeoNtpPollScheduler
+from .services import SERVICE_EXPORT_SAMPLES
+from .services import async_setup_services
+from .statistics import LeoNtpStatistics
 from .utils import _LOGGER
 from .utils import log_debug
 
@@ -23,11 +62,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up LeoNTP from a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
+    # All config entries share one UDP socket to poll their units.
+    if DATA_FLEET_POLLER not in hass.data[DOMAIN]:
+        hass.data[DOMAIN][DATA_FLEET_POLLER] = LeoNtpFleetPoller()
+
     client = LeoNtpClient(
         host = entry.data[CONF_HOST],
         update_interval = entry.data[CONF_UPDATE_INTERVAL]
         if CONF_UPDATE_INTERVAL in entry.data
         else DEFAULT_UPDATE_INTERVAL,
+        poller = hass.data[DOMAIN][DATA_FLEET_POLLER],
+        measure_offset = entry.data.get(CONF_MEASURE_OFFSET, DEFAULT_MEASURE_OFFSET),
+        burst_size = entry.data.get(CONF_BURST_SIZE, DEFAULT_BURST_SIZE),
     )
 
     dev_reg = dr.async_get(hass)
@@ -37,27 +83,85 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         config_entry_id = entry.entry_id,
         dev_reg = dev_reg,
         client = client,
+        heartbeat_interval = entry.data.get(
+            CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL
+        ),
+        deadband = entry.data.get(CONF_DEADBAND, DEFAULT_DEADBAND),
+        sample_interval = entry.data.get(CONF_SAMPLE_INTERVAL, DEFAULT_SAMPLE_INTERVAL),
+        poll_scheduler = LeoNtpPollScheduler(
+            min_interval = client.update_interval,
+            max_interval = entry.data.get(
+                CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+            ),
+            enabled = entry.data.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+        ),
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    # With last known items entities are created right away and the first poll
+    # runs in the background, only a first setup waits for the device.
+    if not await coordinator.async_restore():
+        await coordinator.async_config_entry_first_refresh()
+
+    if not hass.services.has_service(DOMAIN, SERVICE_EXPORT_SAMPLES):
+        async_setup_services(hass)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if coordinator.stale:
+        hass.async_create_task(coordinator.async_refresh())
+
+    coordinator.async_set_sample_interval(
+        entry.data.get(CONF_SAMPLE_INTERVAL, DEFAULT_SAMPLE_INTERVAL)
+    )
+    entry.async_on_unload(coordinator.async_stop_sampling)
+
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    # Stop the sampler first, it appends to the ring files and polls through the shared poller.
+    coordinator: LeoNtpDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.async_stop_sampling()
+
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_close_sample_files()
+
+        if hass.data[DOMAIN].keys() == {DATA_FLEET_POLLER}:
+            hass.data[DOMAIN].pop(DATA_FLEET_POLLER).close()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the last known items and the ring files of a removed config entry."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
+
+    # Devices are removed from the registry after this, their keys name the ring files.
+    paths = [
+        hass.config.path(DOMAIN, f"{identifier}.samples")
+        for device in dr.async_entries_for_config_entry(dr.async_get(hass), entry.entry_id)
+        for domain, identifier in device.identifiers
+        if domain == DOMAIN
+    ]
+
+    def remove_sample_files() -> None:
+        for path in paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    await hass.async_add_executor_job(remove_sample_files)
+
+
+# Item types aggregated over a publish window when sampling faster than the update interval
+WINDOW_ITEM_TYPES = ("offset", "delay", "jitter", "satellites", "gps_lock", "request_rate")
+
+
 class LeoNtpDataUpdateCoordinator(DataUpdateCoordinator):
     """Data update coordinator for LeoNTP."""
 
-    data: list[LeoNtpItem]
+    data: dict[str, LeoNtpItem]
     config_entry: ConfigEntry
 
     def __init__(
@@ -66,12 +170,43 @@ class LeoNtpDataUpdateCoordinator(DataUpdateCoordinator):
         config_entry_id: str,
         dev_reg: dr.DeviceRegistry,
         client: LeoNtpClient,
+        heartbeat_interval: int = DEFAULT_HEARTBEAT_INTERVAL,
+        deadband: float = DEFAULT_DEADBAND,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+        poll_scheduler: LeoNtpPollScheduler | None = None,
     ) -> None:
         """Initialize coordinator."""
         self._config_entry_id = config_entry_id
         self._device_registry = dev_reg
         self.client = client
         self.hass = hass
+        # Maximum seconds between two state writes of an unchanged value, 0 disables
+        self.heartbeat_interval = heartbeat_interval
+        # Milliseconds a measurement may move without a state write
+        self.deadband = deadband
+        self.state_writes = {"emitted": 0, "suppressed": 0}
+        # Device keys last reconciled with the device registry
+        self._device_keys: set[str] | None = None
+        self.poll_scheduler = poll_scheduler or LeoNtpPollScheduler(
+            client.update_interval, client.update_interval
+        )
+        # Background sampling between publishes, per item type aggregates
+        self._sampler: asyncio.Task | None = None
+        self._windows = {item_type: LeoNtpWindowStats() for item_type in WINDOW_ITEM_TYPES}
+        self._samples = 0
+        self._sample_items: dict[str, LeoNtpItem] | None = None
+        self._sample_error: Exception | None = None
+        # Hourly long-term statistics, imported instead of relying on per poll states
+        self.statistics = LeoNtpStatistics(hass)
+        # Raw sample ring files by device key, None while a file is being opened
+        self.sample_files: dict[str, LeoNtpSampleFile | None] = {}
+        # Configured sample interval, sizes the ring files before the sampler starts
+        self._sample_file_interval = sample_interval
+        self._sample_files_closed = False
+        # Last known items, restored at setup and stale until the first successful poll
+        self.stale = False
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{config_entry_id}")
+        self._stored_at: float | None = None
 
         super().__init__(
             hass,
@@ -81,10 +216,282 @@ class LeoNtpDataUpdateCoordinator(DataUpdateCoordinator):
         )
 
 
-    async def _async_update_data(self) -> dict | None:
+    @callback
+    def async_apply_options(self, data: Mapping[str, Any]) -> None:
+        """Apply changed options in place, without reloading the config entry."""
+        update_interval = data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+        self.client.update_interval = update_interval
+        self.poll_scheduler.min_interval = update_interval
+        self.poll_scheduler.max_interval = data.get(
+            CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+        )
+        self.poll_scheduler.enabled = data.get(
+            CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+        )
+        self.update_interval = timedelta(seconds = self.poll_scheduler.reset())
+        self.heartbeat_interval = data.get(
+            CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL
+        )
+        self.deadband = data.get(CONF_DEADBAND, DEFAULT_DEADBAND)
+        self.client.burst_size = data.get(CONF_BURST_SIZE, DEFAULT_BURST_SIZE)
+        self.async_set_sample_interval(
+            data.get(CONF_SAMPLE_INTERVAL, DEFAULT_SAMPLE_INTERVAL)
+        )
+
+        if data[CONF_HOST] != self.client.host:
+            self.client.set_host(data[CONF_HOST])
+
+            for device_key in self._device_keys or ():
+                if device := self._device_registry.async_get_device(
+                    {(DOMAIN, device_key)}
+                ):
+                    self._device_registry.async_update_device(
+                        device.id, name = f"{NAME} {data[CONF_HOST]}:{PORT}"
+                    )
+
+        log_debug(
+            f"[init|LeoNtpDataUpdateCoordinator|async_apply_options] {self.client.host}, {self.update_interval}"
+        )
+
+        # Refresh now so the new interval is scheduled from this poll on.
+        self.hass.async_create_task(self.async_request_refresh())
+
+    async def async_restore(self) -> bool:
+        """Restore the last known items as stale data, return if there were any."""
+        if not (stored := await self._store.async_load()):
+            return False
+
+        items = []
+
+        try:
+            for stored_item in stored.get("items", []):
+                item = LeoNtpItem(**stored_item)
+
+                if item.type in TIMESTAMP_ITEM_TYPES and isinstance(item.state, str):
+                    item.state = dt_util.parse_datetime(item.state)
+
+                items.append(item)
+        except (TypeError, ValueError) as exception:
+            # Items stored by another version of LeoNtpItem, wait for the device instead.
+            log_debug(
+                f"[init|LeoNtpDataUpdateCoordinator|async_restore] {self.client.host}, ignoring stored items: {exception}",
+                True,
+            )
+            return False
+
+        if not (data := self.client.restore_items(items)):
+            return False
+
+        self.data = data
+        self._device_keys = {str(item.device_key) for item in data.values()}
+        self.stale = True
+
+        log_debug(f"[init|LeoNtpDataUpdateCoordinator|async_restore] {self.client.host}, {len(data)} items")
+
+        return True
+
+    @callback
+    def _async_save(self) -> None:
+        """Schedule a write of the last known items, at most once per STORAGE_SAVE_INTERVAL."""
+        now = time.monotonic()
+
+        if self._stored_at is None or now - self._stored_at >= STORAGE_SAVE_INTERVAL:
+            self._stored_at = now
+            self._store.async_delay_save(self._stored_data, STORAGE_SAVE_INTERVAL)
+
+    @callback
+    def _stored_data(self) -> dict:
+        """Return the last known items to store."""
+        return {"items": [asdict(item) for item in (self.data or {}).values()]}
+
+    @callback
+    def async_set_sample_interval(self, sample_interval: float) -> None:
+        """Sample faster than the update interval in the background, 0 stops sampling."""
+        self.async_stop_sampling()
+        self._sample_file_interval = sample_interval
+
+        if 0 < sample_interval < self.client.update_interval:
+            self.client.sample_interval = sample_interval
+            self._sampler = self.hass.async_create_background_task(
+                self._async_sample(sample_interval),
+                f"{DOMAIN} sampler {self.client.host}",
+            )
+
+    @callback
+    def async_stop_sampling(self) -> None:
+        """Stop background sampling and drop the pending samples."""
+        if self._sampler is not None:
+            self._sampler.cancel()
+            self._sampler = None
+
+        self.client.sample_interval = 0
+        self._samples = 0
+        self._sample_error = None
+
+        for window in self._windows.values():
+            window.reset()
+
+    async def _async_sample(self, sample_interval: float) -> None:
+        """Sample the device every sample interval, aggregating values until the next publish."""
+        loop = asyncio.get_running_loop()
+        next_sample = loop.time()
+
+        while True:
+            try:
+                self._sample_items = await self.client.fetch_data()
+            except Exception as exception:  # noqa: BLE001
+                self._sample_error = exception
+                log_debug(
+                    f"[init|LeoNtpDataUpdateCoordinator|_async_sample|error] {self.client.host}, {exception}"
+                )
+            else:
+                self._samples += 1
+                items = self.client.items
+                self.statistics.async_add(items, time.time())
+                self._async_record_sample()
+
+                for item_type, window in self._windows.items():
+                    if (item := items.get(item_type)) is not None and item.state is not None:
+                        window.add(item.state)
+
+            # Keep a fixed cadence, skipping samples the device was too slow to answer.
+            next_sample += sample_interval
+            now = loop.time()
+
+            if next_sample < now:
+                next_sample = now
+
+            await asyncio.sleep(next_sample - now)
+
+    @callback
+    def _async_record_sample(self) -> None:
+        """Append the last poll to the ring file of its device, opening the file on first use."""
+        items = self.client.items
+        status = self.client.status
+        device_key = items["serial_number"].device_key
+
+        if (sample_file := self.sample_files.get(device_key)) is not None:
+            offset = items.get("offset")
+            delay = items.get("delay")
+            sample_file.append(
+                time.time(),
+                math.nan if offset is None or offset.state is None else offset.state,
+                math.nan if delay is None or delay.state is None else delay.state,
+                status.gps_satellites,
+                status.gps_flags,
+                status.ntp_served,
+                status.uptime,
+                status.gps_lock_time,
+            )
+        elif device_key not in self.sample_files and not self._sample_files_closed:
+            self.sample_files[device_key] = None
+            self.hass.async_create_task(self._async_open_sample_file(device_key))
+
+    async def _async_open_sample_file(self, device_key: str) -> None:
+        """Open the ring file of a device in the executor.
+
+        The file is sized for the configured sample interval, also when the
+        first refresh opens it before the sampler has started.
+        """
+        interval = self.client.update_interval
+
+        if 0 < self._sample_file_interval < interval:
+            interval = self._sample_file_interval
+
+        try:
+            sample_file = await self.hass.async_add_executor_job(
+                LeoNtpSampleFile,
+                self.hass.config.path(DOMAIN, f"{device_key}.samples"),
+                sample_file_capacity(interval),
+            )
+        except OSError as exception:
+            log_debug(
+                f"[init|LeoNtpDataUpdateCoordinator|_async_open_sample_file|error] {device_key}, {exception}",
+                True,
+            )
+            return
+
+        if self._sample_files_closed:
+            # The entry was unloaded while the file was being opened.
+            await self.hass.async_add_executor_job(sample_file.close)
+            return
+
+        self.sample_files[device_key] = sample_file
+
+    async def async_close_sample_files(self) -> None:
+        """Close the ring files, no file is opened afterwards."""
+        self._sample_files_closed = True
+        sample_files = [
+            sample_file for sample_file in self.sample_files.values() if sample_file is not None
+        ]
+        self.sample_files.clear()
+
+        def close_sample_files() -> None:
+            for sample_file in sample_files:
+                sample_file.close()
+
+        await self.hass.async_add_executor_job(close_sample_files)
+
+    def _publish_samples(self) -> dict[str, LeoNtpItem] | None:
+        """Publish the aggregates of the samples taken since the last update.
+
+        Return None when no sample has completed since then, e.g. right after
+        the sampler started.
+        """
+        if not self._samples and self._sample_error is None:
+            return None
+
+        if not self._samples:
+            raise LeoNtpServiceException(
+                f"No successful sample since the last update: {self._sample_error}"
+            )
+
+        items = self.client.items
+
+        for item_type, window in self._windows.items():
+            if (item := items.get(item_type)) is not None:
+                window.publish(item.extra_attributes)
+
+        self._samples = 0
+        self._sample_error = None
+
+        return self._sample_items
+
+    async def _async_fetch_data(self) -> dict[str, LeoNtpItem] | None:
+        """Fetch or publish sampled data and adapt the poll interval to the result.
+
+        Return None when the sampler has nothing to publish yet.
+        """
+        try:
+            if self._sampler is not None:
+                if (items := self._publish_samples()) is None:
+                    return None
+            else:
+                # The interval this poll was scheduled with, the Allan deviation tau follows it.
+                self.client.poll_interval = self.update_interval.total_seconds()
+                items = await self.client.fetch_data()
+                self.statistics.async_add(self.client.items, time.time())
+                self._async_record_sample()
+        except Exception:
+            self.update_interval = timedelta(seconds = self.poll_scheduler.reset())
+            raise
+
+        if (status := self.client.status) is not None:
+            self.update_interval = timedelta(
+                seconds = self.poll_scheduler.update(
+                    gps_lock = (status.gps_flags & 1) == 1,
+                    satellites = status.gps_satellites,
+                    jitter = self.client.jitter,
+                    jitter_required = self.client.measure_offset,
+                )
+            )
+
+        return items
+
+    async def _async_update_data(self) -> dict:
         """Update data."""
         try:
-            items = await self.hass.async_add_executor_job(self.client.fetch_data)
+            items = await self._async_fetch_data()
         except ConnectionError as exception:
             raise UpdateFailed(f"ConnectionError {exception}") from exception
         except LeoNtpServiceException as exception:
@@ -94,11 +501,40 @@ class LeoNtpDataUpdateCoordinator(DataUpdateCoordinator):
         except Exception as exception:
             raise UpdateFailed(f"Exception {exception}") from exception
 
+        if items is None:
+            # No sample has completed in this window yet, keep the previous data until the next update.
+            log_debug(
+                f"[init|LeoNtpDataUpdateCoordinator|_async_update_data] {self.client.host}, no sample to publish yet"
+            )
+            return self.data
+
         log_debug(
             f"[init|LeoNtpDataUpdateCoordinator|_async_update_data|items] {items}"
         )
 
-        items: list[LeoNtpItem] = items
+        items: dict[str, LeoNtpItem] = items
+
+        if len(items) > 0:
+            # The client returns the same dict for a device on every poll, a new
+            # dict means the set of devices behind this entry has changed.
+            # Entities for new devices are added by the sensor platform listener.
+            if items is not self.data:
+                fetched_items = {str(item.device_key) for item in items.values()}
+
+                if fetched_items != self._device_keys:
+                    self._async_remove_stale_devices(fetched_items)
+
+            self.stale = False
+            self._async_save()
+            return items
+        return []
+
+    @callback
+    def _async_remove_stale_devices(self, fetched_items: set[str]) -> None:
+        """Remove devices no longer reported from the device registry."""
+        log_debug(
+            f"[init|LeoNtpDataUpdateCoordinator|_async_remove_stale_devices|fetched_items] {fetched_items}"
+        )
 
         current_items = {
             list(device.identifiers)[0][1]
@@ -107,33 +543,15 @@ class LeoNtpDataUpdateCoordinator(DataUpdateCoordinator):
             )
         }
 
-        if len(items) > 0:
-            fetched_items = {str(items[item].device_key) for item in items}
+        if stale_items := current_items - fetched_items:
+            for device_key in stale_items:
+                if device := self._device_registry.async_get_device(
+                    {(DOMAIN, device_key)}
+                ):
+                    log_debug(
+                        f"[init|LeoNtpDataUpdateCoordinator|_async_remove_stale_devices|async_remove_device] {device_key}",
+                        True,
+                    )
+                    self._device_registry.async_remove_device(device.id)
 
-            log_debug(
-                f"[init|LeoNtpDataUpdateCoordinator|_async_update_data|fetched_items] {fetched_items}"
-            )
-
-            if stale_items := current_items - fetched_items:
-                for device_key in stale_items:
-                    if device := self._device_registry.async_get_device(
-                        {(DOMAIN, device_key)}
-                    ):
-                        log_debug(
-                            f"[init|LeoNtpDataUpdateCoordinator|_async_update_data|async_remove_device] {device_key}",
-                            True,
-                        )
-                        self._device_registry.async_remove_device(device.id)
-
-            # If there are new items, we should reload the config entry so we can
-            # create new devices and entities.
-            if self.data and fetched_items - {
-                str(self.data[item].device_key) for item in self.data
-            }:
-                # log_debug(f"[init|LeoNtpDataUpdateCoordinator|_async_update_data|async_reload] {product.product_name}", True)
-                self.hass.async_create_task(
-                    self.hass.config_entries.async_reload(self._config_entry_id)
-                )
-                return None
-            return items
-        return []
+        self._device_keys = fetched_items
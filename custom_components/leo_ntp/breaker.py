@@ -0,0 +1,95 @@
+"""Circuit breaker for unreachable LeoNTP units."""
+from __future__ import annotations
+
+import time
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Consecutive failed polls before the breaker opens
+FAILURE_THRESHOLD = 3
+
+# Seconds the breaker first stays open, doubled after every failed probe
+BASE_BACKOFF = 10
+
+# Maximum seconds the breaker stays open before probing again
+MAX_BACKOFF = 600
+
+
+class LeoNtpCircuitBreaker:
+    """Per host circuit breaker with exponential backoff.
+
+    Closed, polls go out as usual. After FAILURE_THRESHOLD consecutive failures
+    it opens and polls fail without touching the socket. Once the backoff has
+    passed it is half open and lets a single probe through: a response closes
+    it, a failure opens it again for twice as long, up to MAX_BACKOFF.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        base_backoff: float = BASE_BACKOFF,
+        max_backoff: float = MAX_BACKOFF,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.backoff = 0.0
+        self._since = time.monotonic()
+        self._retry_at = 0.0
+
+    def _set_state(self, state: str, now: float) -> None:
+        """Move to a state."""
+        if state != self.state:
+            self.state = state
+            self._since = now
+
+    def allow(self, now: float) -> bool:
+        """Return if a poll may go out, moving to half open once the backoff has passed."""
+        if self.state == STATE_CLOSED:
+            return True
+
+        if self.state == STATE_OPEN and now >= self._retry_at:
+            self._set_state(STATE_HALF_OPEN, now)
+            return True
+
+        # Open, or half open with the probe still in flight
+        return False
+
+    def record_success(self, now: float) -> None:
+        """Account for a response."""
+        self.failures = 0
+        self.backoff = 0.0
+        self._set_state(STATE_CLOSED, now)
+
+    def record_failure(self, now: float) -> None:
+        """Account for a failed poll, opening the breaker when needed."""
+        self.failures += 1
+
+        if self.state == STATE_HALF_OPEN:
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+        elif self.state == STATE_CLOSED and self.failures >= self.failure_threshold:
+            self.backoff = self.base_backoff
+        else:
+            return
+
+        self._retry_at = now + self.backoff
+        self._set_state(STATE_OPEN, now)
+
+    def record_abort(self, now: float) -> None:
+        """Account for a poll abandoned before it could fail, so a half open probe is retried."""
+        if self.state == STATE_HALF_OPEN:
+            self._retry_at = now
+            self._set_state(STATE_OPEN, now)
+
+    def time_in_state(self, now: float) -> float:
+        """Return the seconds spent in the current state."""
+        return now - self._since
+
+    def retry_in(self, now: float) -> float:
+        """Return the seconds until the next probe, 0 when polls go out."""
+        return max(self._retry_at - now, 0.0) if self.state == STATE_OPEN else 0.0
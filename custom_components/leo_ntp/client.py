@@ -1,19 +1,382 @@
 """LeoNTP API Client."""
 from __future__ import annotations
 
+import asyncio
+from collections import deque
+from datetime import datetime
+from datetime import timezone
+import math
+import secrets
 import socket
-import struct
 import time
+from typing import NamedTuple
 
 from .const import DEFAULT_UPDATE_INTERVAL
 from .const import DOMAIN
 from .const import PORT
+from .const import REQUEST_TIMEOUT
+
+from .breaker import LeoNtpCircuitBreaker
+
+from .exceptions import LeoNtpCircuitOpenException
+from .exceptions import LeoNtpServiceException
+
+from .history import LeoNtpCounterRate
+from .history import LeoNtpHistory
+from .history import LeoNtpRollingStats
 
 from .models import LeoNtpItem
 
+from .packet import STATUS_REQUEST
+from .packet import LeoNtpStatus
+from .packet import TIME1970
+from .packet import decode_status
+from .packet import decode_time
+from .packet import encode_client_request
+from .packet import ntp_to_unix
+from .packet import reply_mode
+from .packet import request_token
+from .packet import response_token
+from .packet import valid_response
+
 from .utils import format_entity_name
 from .utils import log_debug
 
+# Receive buffer for the shared socket, large enough to absorb a full fleet burst
+FLEET_RECEIVE_BUFFER = 1 << 20
+
+# Seconds a resolved hostname is reused before it is looked up again
+RESOLVE_TTL = 300
+
+# Requests sent back-to-back between two pauses of a paced poll
+SEND_BATCH_SIZE = 64
+
+# Seconds after a timeout during which a reply to the timed out request is counted as late
+LATE_REPLY_WINDOW = 30
+
+# Number of recent offsets the jitter is computed over
+JITTER_SAMPLES = 8
+
+# Seconds a recomputed event time may move before it is considered a new event
+EVENT_TIME_TOLERANCE = 2
+
+# Item types reported for every LeoNTP device, with their sensor names
+ITEM_TYPES = {
+    "utc_time": "UTC Time",
+    "ntp_time": "NTP Time",
+    "requests_served": "NTP Requests",
+    "request_rate": "NTP Request Rate",
+    "request_rate_average": "NTP Request Rate Average",
+    "uptime": "Uptime",
+    "gps_lock": "GPS Lock",
+    "gps_lock_time": "GPS Lock Time",
+    "boot_time": "Boot Time",
+    "gps_lock_since": "GPS Lock Since",
+    "gps_flags": "GPS Flags",
+    "satellites": "GPS Satellites",
+    "firmware_version": "Firmware Version",
+    "serial_number": "Serial Number",
+}
+
+# Item types whose state is a datetime
+TIMESTAMP_ITEM_TYPES = {"utc_time", "boot_time", "gps_lock_since"}
+
+# Item types reported when clock offset measurement is enabled
+MEASUREMENT_ITEM_TYPES = {
+    "offset": "Clock Offset",
+    "delay": "Round-trip Delay",
+    "jitter": "Jitter",
+    "offset_spread": "Offset Spread",
+}
+
+
+def update_stats_attributes(attributes: dict, stats: LeoNtpRollingStats, scale: float = 1000) -> None:
+    """Update rolling statistics attributes in place, scaled from seconds (to ms by default)."""
+    attributes["mean"] = round(stats.mean * scale, 3)
+    attributes["min"] = round(stats.min * scale, 3)
+    attributes["max"] = round(stats.max * scale, 3)
+    attributes["stddev"] = round((stats.stddev or 0.0) * scale, 3)
+    attributes["samples"] = stats.count
+
+
+def event_time(previous: datetime | None, timestamp: float) -> datetime:
+    """Return the time of an event, keeping the previous one unless it moved beyond the tolerance.
+
+    Event times computed from a clock and an elapsed seconds counter wobble by
+    a second between polls, keeping the previous value makes them change only
+    when the event actually happens again.
+    """
+    if previous is not None and abs(previous.timestamp() - timestamp) <= EVENT_TIME_TOLERANCE:
+        return previous
+
+    return datetime.fromtimestamp(round(timestamp), timezone.utc)
+
+
+class LeoNtpResponse(NamedTuple):
+    """Datagram received for a request, with perf_counter send and receive times."""
+
+    data: bytes
+    sent: float
+    received: float
+
+
+class LeoNtpFleetProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol dispatching LeoNTP responses by source address."""
+
+    def __init__(self, track_late: bool = True) -> None:
+        """Initialize LeoNTP fleet protocol."""
+        self.transport: asyncio.DatagramTransport | None = None
+        # (source address, response mode, echoed request bytes) -> (response future, perf_counter send time)
+        self.pending: dict[tuple, tuple[asyncio.Future[LeoNtpResponse], float]] = {}
+        # Number of polls waiting for each pending request
+        self.waiters: dict[tuple, int] = {}
+        # Without late tracking replies to timed out requests count as unsolicited.
+        self.track_late = track_late
+        # Keys of timed out requests -> monotonic time until which their replies count as late
+        self.expired: dict[tuple, float] = {}
+        # (until, key) in the order the requests timed out, which is the order they stop counting as late
+        self._expiry: deque[tuple[float, tuple]] = deque()
+        # Datagrams dropped, by reason
+        self.dropped = {"invalid": 0, "late": 0, "unsolicited": 0}
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Store the transport once the endpoint is ready."""
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        """Resolve the request pending for the source address, mode and echoed bytes, if any.
+
+        Only a well-formed reply from the polled address, in the expected mode
+        and echoing the request nonce, resolves a request. Anything else is
+        dropped and counted.
+        """
+        received = time.perf_counter()
+
+        if not valid_response(data):
+            self.dropped["invalid"] += 1
+            log_debug(f"[LeoNtpFleetProtocol|datagram_received] Invalid datagram from {addr}")
+            return
+
+        key = (addr[:2], data[0] & 7, response_token(data))
+
+        if (pending := self.pending.pop(key, None)) is not None:
+            if not pending[0].done():
+                pending[0].set_result(LeoNtpResponse(data, pending[1], received))
+        elif self.expired.pop(key, 0) >= time.monotonic():
+            self.dropped["late"] += 1
+            log_debug(f"[LeoNtpFleetProtocol|datagram_received] Late reply from {addr}")
+        else:
+            self.dropped["unsolicited"] += 1
+            log_debug(f"[LeoNtpFleetProtocol|datagram_received] Unsolicited datagram from {addr}")
+
+    def expire(self, key: tuple) -> None:
+        """Drop a timed out request, counting a reply arriving within LATE_REPLY_WINDOW as late."""
+        del self.pending[key]
+
+        if not self.track_late:
+            return
+
+        now = time.monotonic()
+        until = self.expired[key] = now + LATE_REPLY_WINDOW
+        self._expiry.append((until, key))
+
+        # Forget requests whose replies can no longer be told apart from unsolicited ones.
+        while self._expiry and self._expiry[0][0] < now:
+            until, expired_key = self._expiry.popleft()
+
+            # The key may have timed out again since, or its late reply was already counted.
+            if self.expired.get(expired_key) == until:
+                del self.expired[expired_key]
+
+    def release(self, key: tuple, future: asyncio.Future[LeoNtpResponse]) -> None:
+        """Stop waiting for a request, expiring it once no poll waits for it and no reply came."""
+        if (waiters := self.waiters.pop(key, 1) - 1) > 0:
+            self.waiters[key] = waiters
+        elif (
+            not future.done()
+            and (pending := self.pending.get(key)) is not None
+            and pending[0] is future
+        ):
+            self.expire(key)
+
+    def error_received(self, exc: Exception) -> None:
+        """Log ICMP errors, they cannot be matched to a host on a shared socket."""
+        log_debug(f"[LeoNtpFleetProtocol|error_received] {exc}")
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Fail all pending requests when the endpoint closes."""
+        for future, _ in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(exc or "Connection closed"))
+
+        self.pending.clear()
+        self.waiters.clear()
+
+
+class LeoNtpFleetPoller:
+    """Poll many LeoNTP units over long-lived UDP sockets, one per address family."""
+
+    def __init__(self, timeout: float = REQUEST_TIMEOUT, track_late: bool = True) -> None:
+        """Initialize LeoNTP fleet poller."""
+        self.timeout = timeout
+        self.track_late = track_late
+        self._endpoints: dict[int, tuple[asyncio.DatagramTransport, LeoNtpFleetProtocol]] = {}
+        self._addresses: dict[str, tuple[tuple[int, tuple], float]] = {}
+        self._lock = asyncio.Lock()
+
+    async def _async_endpoint(
+        self, family: int
+    ) -> tuple[asyncio.DatagramTransport, LeoNtpFleetProtocol]:
+        """Return the endpoint for an address family, opening it on first use."""
+        async with self._lock:
+            endpoint = self._endpoints.get(family)
+
+            if endpoint is None or endpoint[0].is_closing():
+                loop = asyncio.get_running_loop()
+                endpoint = await loop.create_datagram_endpoint(
+                    lambda: LeoNtpFleetProtocol(self.track_late),
+                    local_addr = ("::" if family == socket.AF_INET6 else "0.0.0.0", 0),
+                    family = family,
+                )
+                sock = endpoint[0].get_extra_info("socket")
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, FLEET_RECEIVE_BUFFER)
+                self._endpoints[family] = endpoint
+
+        return endpoint
+
+    async def _async_resolve(self, host: str) -> tuple[int, tuple]:
+        """Resolve a host to its address family and socket address, cached for RESOLVE_TTL."""
+        now = time.monotonic()
+        cached = self._addresses.get(host)
+
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        try:
+            # IP literals resolve without touching the network and never expire.
+            infos = socket.getaddrinfo(
+                host, PORT, type = socket.SOCK_DGRAM, flags = socket.AI_NUMERICHOST
+            )
+            expires = math.inf
+        except socket.gaierror:
+            loop = asyncio.get_running_loop()
+
+            try:
+                infos = await loop.getaddrinfo(host, PORT, type = socket.SOCK_DGRAM)
+            except OSError as exception:
+                if cached is not None:
+                    log_debug(
+                        f"[LeoNtpFleetPoller|_async_resolve] Using last known address for {host}: {exception}"
+                    )
+                    return cached[0]
+
+                raise ConnectionError(f"Unable to resolve {host}: {exception}") from exception
+
+            expires = now + RESOLVE_TTL
+
+        if not infos:
+            raise ConnectionError(f"Unable to resolve {host}")
+
+        family, _, _, _, sockaddr = infos[0]
+        self._addresses[host] = ((family, sockaddr), expires)
+
+        return family, sockaddr
+
+    async def async_poll(
+        self,
+        hosts: list[str],
+        request: bytes = STATUS_REQUEST,
+        rate: float | None = None,
+    ) -> dict[str, LeoNtpResponse | Exception]:
+        """Send a request to every host and collect the responses.
+
+        Requests go out in one burst, or paced to rate requests per second in
+        batches of SEND_BATCH_SIZE. The timeout starts after the last request.
+        """
+        results: dict[str, LeoNtpResponse | Exception] = {}
+        waiting: dict[str, tuple[LeoNtpFleetProtocol, tuple, asyncio.Future[LeoNtpResponse]]] = {}
+        mode = reply_mode(request)
+        token = request_token(request)
+
+        addresses = await asyncio.gather(
+            *(self._async_resolve(host) for host in hosts), return_exceptions = True
+        )
+
+        loop = asyncio.get_running_loop()
+        sent = 0
+
+        try:
+            for host, address in zip(hosts, addresses):
+                if isinstance(address, Exception):
+                    results[host] = address
+                    continue
+
+                if rate and sent and sent % SEND_BATCH_SIZE == 0:
+                    await asyncio.sleep(SEND_BATCH_SIZE / rate)
+
+                family, sockaddr = address
+                transport, protocol = await self._async_endpoint(family)
+                key = (sockaddr[:2], mode, token)
+
+                # Requests to a unit that is already being polled share its response.
+                if (pending := protocol.pending.get(key)) is None:
+                    pending = protocol.pending[key] = (loop.create_future(), time.perf_counter())
+                    transport.sendto(request, sockaddr)
+                    sent += 1
+
+                protocol.waiters[key] = protocol.waiters.get(key, 0) + 1
+                waiting[host] = (protocol, key, pending[0])
+
+            if waiting:
+                await asyncio.wait({future for _, _, future in waiting.values()}, timeout = self.timeout)
+        finally:
+            # Also when cancelled, so the next poll sends a new request instead of
+            # sharing one nobody waits for any more.
+            for protocol, key, future in waiting.values():
+                protocol.release(key, future)
+
+        for host, (_, _, future) in waiting.items():
+            if not future.done():
+                results[host] = ConnectionError(
+                    f"No response from {host}:{PORT} within {self.timeout}s"
+                )
+            elif future.exception() is not None:
+                results[host] = future.exception()
+            else:
+                results[host] = future.result()
+
+        return results
+
+    async def async_request(
+        self, host: str, request: bytes = STATUS_REQUEST
+    ) -> LeoNtpResponse:
+        """Send a request to a single host."""
+        result = (await self.async_poll([host], request))[host]
+
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+    @property
+    def dropped(self) -> dict[str, int]:
+        """Return the datagrams dropped by all sockets, by reason."""
+        dropped = {"invalid": 0, "late": 0, "unsolicited": 0}
+
+        for _, protocol in self._endpoints.values():
+            for reason, count in protocol.dropped.items():
+                dropped[reason] += count
+
+        return dropped
+
+    def close(self) -> None:
+        """Close all sockets."""
+        for transport, _ in self._endpoints.values():
+            transport.close()
+
+        self._endpoints.clear()
+
+
 class LeoNtpClient:
     """LeoNTP client."""
 
@@ -21,204 +384,279 @@ class LeoNtpClient:
         self,
         host: str | None = None,
         update_interval: int | None = None,
+        poller: LeoNtpFleetPoller | None = None,
+        measure_offset: bool = False,
+        burst_size: int = 1,
     ) -> None:
         """Initialize LeoNTP Client."""
         self.host = host
         self.update_interval = (
             update_interval if update_interval else DEFAULT_UPDATE_INTERVAL
         )
+        # Without a shared poller the client keeps its own socket for its lifetime.
+        self._owns_poller = poller is None
+        self.poller = poller if poller is not None else LeoNtpFleetPoller()
+        self.measure_offset = measure_offset
+        self.burst_size = burst_size
+        self._offsets: deque[float] = deque(maxlen = JITTER_SAMPLES)
+        # Items are built once per device serial number, polls only update their state.
+        self._items: dict[int, dict[str, LeoNtpItem]] = {}
+        self._data: dict[int, dict[str, LeoNtpItem]] = {}
+        self._history: dict[int, LeoNtpHistory] = {}
+        self._request_rates: dict[int, LeoNtpCounterRate] = {}
+        # Seconds between samples when sampling faster than the update interval, 0 when not
+        self.sample_interval: float = 0
+        # Seconds between polls, follows the adaptive poll interval
+        self.poll_interval: float = self.update_interval
+        # Last decoded status and jitter (in seconds), for poll scheduling
+        self.status: LeoNtpStatus | None = None
+        self.jitter: float | None = None
+        # Items of the last polled device, keyed by type
+        self.items: dict[str, LeoNtpItem] | None = None
+        # Stops polling an unreachable host until it answers a probe again
+        self.breaker = LeoNtpCircuitBreaker()
+
+
+    async def _async_request(self) -> LeoNtpResponse:
+        """Send a LeoNTP status request and wait for the response on the event loop."""
+        breaker = self.breaker
+
+        if not breaker.allow(time.monotonic()):
+            raise LeoNtpCircuitOpenException(
+                f"{self.host}:{PORT} unreachable, {breaker.failures} failed polls, "
+                f"next probe in {breaker.retry_in(time.monotonic()):.0f}s"
+            )
 
+        try:
+            response = await self.poller.async_request(self.host)
+        except Exception:
+            breaker.record_failure(time.monotonic())
+            raise
+        except BaseException:
+            # Cancelled, the unit was not given a chance to answer.
+            breaker.record_abort(time.monotonic())
+            raise
+
+        breaker.record_success(time.monotonic())
+
+        return response
+
+
+    async def _async_measure(self) -> tuple[float, float, float]:
+        """Measure clock offset, round-trip delay and offset spread in seconds.
+
+        A burst of client (mode 3) requests is sent back-to-back and, like the
+        ntpd clock filter, the sample with the lowest round-trip delay is kept.
+        """
+        # Send and receive times are taken locally, so the transmit timestamp only has to be
+        # echoed back: a random nonce per request lets no stale or spoofed reply match.
+        nonce = secrets.randbits(64)
+        responses = await asyncio.gather(
+            *(
+                self.poller.async_request(
+                    self.host, encode_client_request((nonce + index) & 0xFFFFFFFFFFFFFFFF)
+                )
+                for index in range(self.burst_size)
+            ),
+            return_exceptions = True,
+        )
 
-    def validate_server(self):
-        """Validate LeoNTP connection."""
+        # Map the perf_counter send and receive times onto the wall clock.
+        now = time.time()
+        elapsed = time.perf_counter()
+        samples: list[tuple[float, float]] = []
 
-        log_debug(f"[LeoNtpClient|validate_server] Validating connection to {self.host}")
+        for response in responses:
+            if isinstance(response, Exception):
+                log_debug(f"[LeoNtpClient|_async_measure] {self.host}: {response}")
+                continue
 
-        data = {}
-        ntp_server = self.host
-        request_packet = bytearray(48)
-        response_packet = bytearray(48)
+            reply = decode_time(response.data)
 
-        data["name"] = f"{ntp_server}:{PORT}"
+            # Stratum 0 is a kiss-o'-death, leap indicator 3 an unsynchronized server.
+            if reply.stratum == 0 or reply.leap_version_mode >> 6 == 3:
+                log_debug(f"[LeoNtpClient|_async_measure] {self.host}: unsynchronized reply")
+                continue
 
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-            sock.settimeout(3)  # Set a receive timeout of 3 seconds
+            t1 = now - (elapsed - response.sent)
+            t4 = now - (elapsed - response.received)
+            t2 = ntp_to_unix(reply.receive)
+            t3 = ntp_to_unix(reply.transmit)
+            samples.append(((t4 - t1) - (t3 - t2), ((t2 - t1) + (t3 - t4)) / 2))
 
-            # Initialize the NTP request packet
-            request_packet[0] = 4 << 3 | 7
-            request_packet[1] = 0
-            request_packet[2] = 0x10
-            request_packet[3] = 1
+        if not samples:
+            if isinstance(responses[0], Exception):
+                raise responses[0]
 
-            # Send the request packet to the NTP server
-            sock.sendto(request_packet, (ntp_server, PORT))
+            raise LeoNtpServiceException(f"{self.host}:{PORT} is not synchronized")
 
-            # Receive the response packet from the NTP server
-            response_packet, _ = sock.recvfrom(48)
+        delay, offset = min(samples)
+        offsets = [sample[1] for sample in samples]
 
-            serial_number = struct.unpack('<H', response_packet[42:44])[0]
+        return offset, delay, max(offsets) - min(offsets)
 
-            data["id"] = f"{serial_number}"
 
-        return data
+    def _update_jitter(self, offset: float) -> float:
+        """Add an offset sample and return the RMS of successive offset differences."""
+        self._offsets.append(offset)
+        offsets = self._offsets
 
+        if len(offsets) < 2:
+            return 0.0
 
-    def fetch_data(self):
-        """Fetch LeoNTP data."""
+        return math.sqrt(
+            sum((offsets[i] - offsets[i - 1]) ** 2 for i in range(1, len(offsets)))
+            / (len(offsets) - 1)
+        )
 
-        log_debug(f"[LeoNtpClient|fetch_data] Fetching data for {self.host}")
 
-        data = {}
-        ntp_server = self.host
-        request_packet = bytearray(48)
-        response_packet = bytearray(48)
+    def set_host(self, host: str) -> None:
+        """Point the client at a new host, device items are rebuilt on the next poll."""
+        self.host = host
+        self.breaker = LeoNtpCircuitBreaker()
+        self._items.clear()
+        self._data.clear()
+        self._offsets.clear()
 
-        # reference time (in seconds since 1900-01-01 00:00:00) for conversion from NTP time to system time
-        TIME1970 = 2208988800
 
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-            sock.settimeout(3)  # Set a receive timeout of 3 seconds
+    def restore_items(self, items: list[LeoNtpItem]) -> dict[str, LeoNtpItem] | None:
+        """Adopt the items of a device from a previous run, until it is polled again.
 
-            # Initialize the NTP request packet
-            request_packet[0] = 4 << 3 | 7
-            request_packet[1] = 0
-            request_packet[2] = 0x10
-            request_packet[3] = 1
+        Returns the restored items keyed by key, or None when they do not match
+        the items this client reports.
+        """
+        items_by_type = {item.type: item for item in items}
+        item_types = ITEM_TYPES | MEASUREMENT_ITEM_TYPES if self.measure_offset else ITEM_TYPES
 
-            # Send the request packet to the NTP server
-            sock.sendto(request_packet, (ntp_server, PORT))
+        if items_by_type.keys() != item_types.keys() or not isinstance(
+            serial_number := items_by_type["serial_number"].state, int
+        ):
+            return None
 
-            # Receive the response packet from the NTP server
-            response_packet, _ = sock.recvfrom(48)
+        self._items[serial_number] = items_by_type
+        data = self._data[serial_number] = {item.key: item for item in items}
 
-            ref_ts0          = (struct.unpack('<I', response_packet[16:20])[0]) / 4294967296.0  # fractional part of the NTP timestamp
-            ref_ts1          = struct.unpack('<I', response_packet[20:24])[0]                   # full seconds of NTP timestamp
-            uptime           = struct.unpack('<I', response_packet[24:28])[0]
-            ntp_served 	     = struct.unpack('<I', response_packet[28:32])[0]
-            # cmd_served       = struct.unpack('<I', response_packet[32:36])[0]
-            gps_lock_time    = struct.unpack('<I', response_packet[36:40])[0]
-            gps_flags        = response_packet[40]
-            gps_satellites   = response_packet[41]
-            serial_number    = struct.unpack('<H', response_packet[42:44])[0]
-            firmware_version = struct.unpack('<I', response_packet[44:48])[0]
+        return data
 
-            gps_lock = (gps_flags & 1) == 1
 
-            id = serial_number
-            device_model = DOMAIN.title()
-            device_key = format_entity_name(f"{device_model} {id}")
-            device_name = f"{ntp_server}:{PORT}"
-
-            t = time.gmtime(ref_ts1 - TIME1970)
-            key = format_entity_name(f"{id} utc_time")
-            data[key] = LeoNtpItem(
-                name = "UTC Time",
-                key = key,
-                type = "utc_time",
-                device_key = device_key,
-                device_name = device_name,
-                device_model = device_model,
-                state = f"{t.tm_year}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec + ref_ts0:02.0f}",
-            )
+    def close(self) -> None:
+        """Release the socket owned by this client."""
+        if self._owns_poller:
+            self.poller.close()
 
-            key = format_entity_name(f"{id} ntp_time")
-            data[key] = LeoNtpItem(
-                name = "NTP Time",
-                key = key,
-                type = "ntp_time",
-                device_key = device_key,
-                device_name = device_name,
-                device_model = device_model,
-                state = f"{ref_ts1 + ref_ts0:02.0f}",
-            )
 
-            key = format_entity_name(f"{id} requests_served")
-            data[key] = LeoNtpItem(
-                name = "NTP Requests",
-                key = key,
-                type = "requests_served",
-                device_key = device_key,
-                device_name = device_name,
-                device_model = device_model,
-                state = ntp_served,
-            )
+    async def validate_server(self):
+        """Validate LeoNTP connection."""
 
-            key = format_entity_name(f"{id} uptime")
-            data[key] = LeoNtpItem(
-                name = "Uptime",
-                key = key,
-                type = "uptime",
-                device_key = device_key,
-                device_name = device_name,
-                device_model = device_model,
-                state = uptime,
-            )
+        log_debug(f"[LeoNtpClient|validate_server] Validating connection to {self.host}")
 
-            key = format_entity_name(f"{id} gps_lock")
-            data[key] = LeoNtpItem(
-                name = "GPS Lock",
-                key = key,
-                type = "gps_lock",
-                device_key = device_key,
-                device_name = device_name,
-                device_model = device_model,
-                state = gps_lock,
-            )
+        data = {}
+        ntp_server = self.host
 
-            key = format_entity_name(f"{id} gps_lock_time")
-            data[key] = LeoNtpItem(
-                name = "GPS Lock Time",
-                key = key,
-                type = "gps_lock_time",
-                device_key = device_key,
-                device_name = device_name,
-                device_model = device_model,
-                state = gps_lock_time,
-            )
+        data["name"] = f"{ntp_server}:{PORT}"
 
-            key = format_entity_name(f"{id} gps_flags")
-            data[key] = LeoNtpItem(
-                name = "GPS Flags",
-                key = key,
-                type = "gps_flags",
-                device_key = device_key,
-                device_name = device_name,
-                device_model = device_model,
-                state = gps_flags,
-            )
+        status = decode_status((await self._async_request()).data)
 
-            key = format_entity_name(f"{id} satellites")
-            data[key] = LeoNtpItem(
-                name = "GPS Satellites",
-                key = key,
-                type = "satellites",
-                device_key = device_key,
-                device_name = device_name,
-                device_model = device_model,
-                state = gps_satellites,
-            )
+        data["id"] = f"{status.serial_number}"
 
-            key = format_entity_name(f"{id} firmware_version")
-            data[key] = LeoNtpItem(
-                name = "Firmware Version",
-                key = key,
-                type = "firmware_version",
-                device_key = device_key,
-                device_name = device_name,
-                device_model = device_model,
-                state = f"{firmware_version >> 8:x}.{firmware_version & 0xFF:02x}",
-            )
+        return data
 
-            key = format_entity_name(f"{id} serial_number")
-            data[key] = LeoNtpItem(
-                name = "Serial Number",
-                key = key,
-                type = "serial_number",
-                device_key = device_key,
-                device_name = device_name,
-                device_model = device_model,
-                state = serial_number,
-            )
 
-        return data
+    def _device_items(self, serial_number: int) -> dict[str, LeoNtpItem]:
+        """Return the items of a device keyed by type, building them on first use."""
+        if (items := self._items.get(serial_number)) is None:
+            device_model = DOMAIN.title()
+            device_key = format_entity_name(f"{device_model} {serial_number}")
+            device_name = f"{self.host}:{PORT}"
+            item_types = ITEM_TYPES | MEASUREMENT_ITEM_TYPES if self.measure_offset else ITEM_TYPES
+
+            items = self._items[serial_number] = {
+                item_type: LeoNtpItem(
+                    name = name,
+                    key = format_entity_name(f"{serial_number} {item_type}"),
+                    type = item_type,
+                    device_key = device_key,
+                    device_name = device_name,
+                    device_model = device_model,
+                    state = None,
+                )
+                for item_type, name in item_types.items()
+            }
+            self._data[serial_number] = {item.key: item for item in items.values()}
+
+        return items
+
+
+    async def fetch_data(self):
+        """Fetch LeoNTP data."""
+
+        log_debug(f"[LeoNtpClient|fetch_data] Fetching data for {self.host}")
 
+        response = await self._async_request()
+        status = self.status = decode_status(response.data)
+
+        ref_ts0 = status.ref_fraction / 4294967296.0  # fractional part of the NTP timestamp
+        ref_ts1 = status.ref_seconds                  # full seconds of NTP timestamp
+        firmware_version = status.firmware_version
+
+        items = self.items = self._device_items(status.serial_number)
+
+        # Device clock in seconds since the Unix epoch, the reference for its elapsed counters
+        device_time = ref_ts1 - TIME1970 + ref_ts0
+        items["utc_time"].state = datetime.fromtimestamp(device_time, timezone.utc)
+        items["ntp_time"].state = ref_ts1 + ref_ts0
+        items["requests_served"].state = status.ntp_served
+
+        if (request_rate := self._request_rates.get(status.serial_number)) is None:
+            request_rate = self._request_rates[status.serial_number] = LeoNtpCounterRate()
+
+        request_rate.update(status.ntp_served, status.uptime, response.received)
+
+        if request_rate.rate is not None:
+            items["request_rate"].state = round(request_rate.rate, 2)
+            items["request_rate_average"].state = round(request_rate.average, 2)
+        items["uptime"].state = status.uptime
+        items["gps_lock"].state = gps_lock = (status.gps_flags & 1) == 1
+        items["gps_lock_time"].state = status.gps_lock_time
+        items["boot_time"].state = event_time(items["boot_time"].state, device_time - status.uptime)
+        items["gps_lock_since"].state = (
+            event_time(items["gps_lock_since"].state, device_time - status.gps_lock_time)
+            if gps_lock
+            else None
+        )
+        items["gps_flags"].state = status.gps_flags
+        items["satellites"].state = status.gps_satellites
+        items["firmware_version"].state = f"{firmware_version >> 8:x}.{firmware_version & 0xFF:02x}"
+        items["serial_number"].state = status.serial_number
+
+        if self.measure_offset:
+            try:
+                offset, delay, spread = await self._async_measure()
+            except (ConnectionError, LeoNtpServiceException) as exception:
+                # The status is still valid, it matters most while the unit is not synchronized.
+                log_debug(f"[LeoNtpClient|fetch_data] Offset measurement failed for {self.host}: {exception}")
+                self.jitter = None
+
+                for item_type in MEASUREMENT_ITEM_TYPES:
+                    items[item_type].state = None
+
+                return self._data[status.serial_number]
+
+            items["offset"].state = round(offset * 1000, 3)
+            items["delay"].state = round(delay * 1000, 3)
+            items["offset_spread"].state = round(spread * 1000, 3)
+            self.jitter = self._update_jitter(offset)
+            items["jitter"].state = round(self.jitter * 1000, 3)
+
+            if (history := self._history.get(status.serial_number)) is None:
+                history = self._history[status.serial_number] = LeoNtpHistory()
+
+            history.add(offset, delay, self.sample_interval or self.poll_interval)
+            update_stats_attributes(items["offset"].extra_attributes, history.offset)
+            update_stats_attributes(items["delay"].extra_attributes, history.delay)
+            items["offset"].extra_attributes["allan_deviation"] = {
+                f"{tau:g}s": float(f"{deviation:.3g}")
+                for tau, deviation in history.allan_deviation.deviations().items()
+            }
+
+        return self._data[status.serial_number]
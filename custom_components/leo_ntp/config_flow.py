@@ -1,10 +1,12 @@
 """Config flow to configure the LeoNTP integration."""
 from abc import ABC
 from abc import abstractmethod
+import ipaddress
 from typing import Any
 
 import voluptuous as vol
 
+from homeassistant.config_entries import SOURCE_IMPORT
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.config_entries import ConfigFlow
 from homeassistant.config_entries import OptionsFlow
@@ -16,9 +18,13 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowHandler
 from homeassistant.data_entry_flow import FlowResult
 
+from homeassistant.helpers.selector import BooleanSelector
 from homeassistant.helpers.selector import NumberSelector
 from homeassistant.helpers.selector import NumberSelectorConfig
 from homeassistant.helpers.selector import NumberSelectorMode
+from homeassistant.helpers.selector import SelectOptionDict
+from homeassistant.helpers.selector import SelectSelector
+from homeassistant.helpers.selector import SelectSelectorConfig
 
 from homeassistant.helpers.selector import TextSelector
 from homeassistant.helpers.selector import TextSelectorConfig
@@ -27,23 +33,64 @@ from homeassistant.helpers.selector import TextSelectorType
 from homeassistant.helpers.typing import UNDEFINED
 
 from .client import LeoNtpClient
-
+from .client import LeoNtpFleetPoller
+
+from .const import CONF_ADAPTIVE_POLLING
+from .const import CONF_BURST_SIZE
+from .const import CONF_DEVICES
+from .const import CONF_DEADBAND
+from .const import CONF_HEARTBEAT_INTERVAL
+from .const import CONF_MAX_UPDATE_INTERVAL
+from .const import CONF_MEASURE_OFFSET
+from .const import CONF_NETWORK
+from .const import CONF_SAMPLE_INTERVAL
 from .const import CONF_UPDATE_INTERVAL
+from .const import DEFAULT_ADAPTIVE_POLLING
+from .const import DEFAULT_BURST_SIZE
+from .const import DEFAULT_DEADBAND
+from .const import DEFAULT_HEARTBEAT_INTERVAL
+from .const import DEFAULT_MAX_UPDATE_INTERVAL
+from .const import DEFAULT_MEASURE_OFFSET
+from .const import DEFAULT_SAMPLE_INTERVAL
 from .const import DEFAULT_UPDATE_INTERVAL
+from .const import DISCOVERY_MAX_ADDRESSES
+from .const import DISCOVERY_RATE
 from .const import DOMAIN
 from .const import NAME
+from .const import PORT
 
 from .exceptions import LeoNtpServiceException
 
 from .models import LeoNtpConfigEntryData
 
+from .packet import decode_status
+
 from .utils import log_debug
 
 DEFAULT_ENTRY_DATA = LeoNtpConfigEntryData(
     host = None,
     update_interval = DEFAULT_UPDATE_INTERVAL,
+    heartbeat_interval = DEFAULT_HEARTBEAT_INTERVAL,
+    deadband = DEFAULT_DEADBAND,
+    measure_offset = DEFAULT_MEASURE_OFFSET,
+    burst_size = DEFAULT_BURST_SIZE,
+    adaptive_polling = DEFAULT_ADAPTIVE_POLLING,
+    max_update_interval = DEFAULT_MAX_UPDATE_INTERVAL,
+    sample_interval = DEFAULT_SAMPLE_INTERVAL,
 )
 
+# Options a running coordinator can apply without reloading the config entry
+LIVE_OPTIONS = {
+    CONF_HOST,
+    CONF_UPDATE_INTERVAL,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_DEADBAND,
+    CONF_BURST_SIZE,
+    CONF_ADAPTIVE_POLLING,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_SAMPLE_INTERVAL,
+}
+
 class LeoNtpCommonFlow(ABC, FlowHandler):
     """Base class for LeoNTP flows."""
 
@@ -52,6 +99,7 @@ class LeoNtpCommonFlow(ABC, FlowHandler):
         self.initial_data = initial_data
         self.new_entry_data = LeoNtpConfigEntryData()
         self.new_title: str | None = None
+        self.new_device_id: str | None = None
 
     @abstractmethod
     def finish_flow(self) -> FlowResult:
@@ -69,7 +117,10 @@ class LeoNtpCommonFlow(ABC, FlowHandler):
             update_interval = user_input[CONF_UPDATE_INTERVAL],
         )
 
-        return await self.hass.async_add_executor_job(client.validate_server)
+        try:
+            return await client.validate_server()
+        finally:
+            client.close()
 
     async def async_step_connection_init(
         self, user_input: dict | None = None
@@ -142,11 +193,14 @@ class LeoNtpCommonFlow(ABC, FlowHandler):
             test = await self.test_connection(user_input)
 
             if not test["errors"]:
+                self.new_device_id = test["device"].get("id")
                 self.new_entry_data |= LeoNtpConfigEntryData(
                     host = user_input[CONF_HOST],
                 )
                 return self.finish_flow()
 
+            errors = test["errors"]
+
         fields = {
             vol.Required(CONF_HOST): TextSelector(
                 TextSelectorConfig(type = TextSelectorType.TEXT, autocomplete = "host")
@@ -184,6 +238,137 @@ class LeoNtpCommonFlow(ABC, FlowHandler):
             errors = errors,
         )
 
+    async def async_step_heartbeat_interval(self, user_input: dict | None = None) -> FlowResult:
+        """Configure heartbeat interval."""
+        errors: dict = {}
+
+        if user_input is not None:
+            self.new_entry_data |= user_input
+            return self.finish_flow()
+
+        fields = {
+            vol.Required(CONF_HEARTBEAT_INTERVAL): NumberSelector(
+                NumberSelectorConfig(min = 0, max = 86400, step = 1, mode = NumberSelectorMode.BOX)
+            ),
+        }
+        return self.async_show_form(
+            step_id = "heartbeat_interval",
+            data_schema = self.add_suggested_values_to_schema(
+                vol.Schema(fields),
+                self.new_data(),
+            ),
+            errors = errors,
+        )
+
+    async def async_step_deadband(self, user_input: dict | None = None) -> FlowResult:
+        """Configure the deadband of the measurement sensors."""
+        errors: dict = {}
+
+        if user_input is not None:
+            self.new_entry_data |= {CONF_DEADBAND: float(user_input[CONF_DEADBAND])}
+            return self.finish_flow()
+
+        fields = {
+            vol.Required(CONF_DEADBAND): NumberSelector(
+                NumberSelectorConfig(min = 0, max = 1000, step = 0.001, mode = NumberSelectorMode.BOX)
+            ),
+        }
+        return self.async_show_form(
+            step_id = "deadband",
+            data_schema = self.add_suggested_values_to_schema(
+                vol.Schema(fields),
+                self.new_data(),
+            ),
+            errors = errors,
+        )
+
+    async def async_step_measure_offset(self, user_input: dict | None = None) -> FlowResult:
+        """Configure clock offset measurement."""
+        errors: dict = {}
+
+        if user_input is not None:
+            self.new_entry_data |= user_input
+            return self.finish_flow()
+
+        fields = {
+            vol.Required(CONF_MEASURE_OFFSET): BooleanSelector(),
+        }
+        return self.async_show_form(
+            step_id = "measure_offset",
+            data_schema = self.add_suggested_values_to_schema(
+                vol.Schema(fields),
+                self.new_data(),
+            ),
+            errors = errors,
+        )
+
+    async def async_step_burst_size(self, user_input: dict | None = None) -> FlowResult:
+        """Configure burst size."""
+        errors: dict = {}
+
+        if user_input is not None:
+            self.new_entry_data |= {CONF_BURST_SIZE: int(user_input[CONF_BURST_SIZE])}
+            return self.finish_flow()
+
+        fields = {
+            vol.Required(CONF_BURST_SIZE): NumberSelector(
+                NumberSelectorConfig(min = 1, max = 8, step = 1, mode = NumberSelectorMode.BOX)
+            ),
+        }
+        return self.async_show_form(
+            step_id = "burst_size",
+            data_schema = self.add_suggested_values_to_schema(
+                vol.Schema(fields),
+                self.new_data(),
+            ),
+            errors = errors,
+        )
+
+    async def async_step_adaptive_polling(self, user_input: dict | None = None) -> FlowResult:
+        """Configure adaptive polling."""
+        errors: dict = {}
+
+        if user_input is not None:
+            self.new_entry_data |= user_input
+            return self.finish_flow()
+
+        fields = {
+            vol.Required(CONF_ADAPTIVE_POLLING): BooleanSelector(),
+            vol.Required(CONF_MAX_UPDATE_INTERVAL): NumberSelector(
+                NumberSelectorConfig(min = 1, max = 86400, step = 1, mode = NumberSelectorMode.BOX)
+            ),
+        }
+        return self.async_show_form(
+            step_id = "adaptive_polling",
+            data_schema = self.add_suggested_values_to_schema(
+                vol.Schema(fields),
+                self.new_data(),
+            ),
+            errors = errors,
+        )
+
+    async def async_step_sample_interval(self, user_input: dict | None = None) -> FlowResult:
+        """Configure sampling faster than the update interval."""
+        errors: dict = {}
+
+        if user_input is not None:
+            self.new_entry_data |= {CONF_SAMPLE_INTERVAL: float(user_input[CONF_SAMPLE_INTERVAL])}
+            return self.finish_flow()
+
+        fields = {
+            vol.Required(CONF_SAMPLE_INTERVAL): NumberSelector(
+                NumberSelectorConfig(min = 0, max = 60, step = 0.1, mode = NumberSelectorMode.BOX)
+            ),
+        }
+        return self.async_show_form(
+            step_id = "sample_interval",
+            data_schema = self.add_suggested_values_to_schema(
+                vol.Schema(fields),
+                self.new_data(),
+            ),
+            errors = errors,
+        )
+
 
 class LeoNtpOptionsFlow(LeoNtpCommonFlow, OptionsFlow):
     """Handle LeoNTP options."""
@@ -206,10 +391,24 @@ class LeoNtpOptionsFlow(LeoNtpCommonFlow, OptionsFlow):
             title = self.new_title or UNDEFINED,
         )
 
-        self.hass.async_create_task(
-            self.hass.config_entries.async_reload(self.config_entry.entry_id)
+        # Options can be applied to a running coordinator as long as the host
+        # still points at the same LeoNTP device, anything else needs a reload.
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        changed = {
+            key for key, value in new_data.items() if self.initial_data.get(key) != value
+        }
+        same_device = (
+            self.new_device_id is None
+            or self.config_entry.unique_id == f"{DOMAIN}_{self.new_device_id}"
         )
 
+        if coordinator is not None and same_device and changed <= LIVE_OPTIONS:
+            coordinator.async_apply_options(new_data)
+        else:
+            self.hass.async_create_task(
+                self.hass.config_entries.async_reload(self.config_entry.entry_id)
+            )
+
         return self.async_create_entry(title = "", data = {})
 
     async def async_step_init(
@@ -222,6 +421,12 @@ class LeoNtpOptionsFlow(LeoNtpCommonFlow, OptionsFlow):
             menu_options = [
                 "host",
                 "update_interval",
+                "heartbeat_interval",
+                "deadband",
+                "measure_offset",
+                "burst_size",
+                "adaptive_polling",
+                "sample_interval",
             ],
         )
 
@@ -234,6 +439,8 @@ class LeoNtpConfigFlow(LeoNtpCommonFlow, ConfigFlow, domain = DOMAIN):
     def __init__(self) -> None:
         """Initialize LeoNTP Config Flow."""
         super().__init__(initial_data = DEFAULT_ENTRY_DATA)
+        # Unconfigured units found by a network sweep, host by serial number
+        self.discovered: dict[str, str] = {}
 
     @staticmethod
     @callback
@@ -252,4 +459,135 @@ class LeoNtpConfigFlow(LeoNtpCommonFlow, ConfigFlow, domain = DOMAIN):
 
     async def async_step_user(self, user_input: dict | None = None) -> FlowResult:
         """Handle a flow initialized by the user."""
-        return await self.async_step_connection_init()
+        return self.async_show_menu(
+            step_id = "user",
+            menu_options = [
+                "connection_init",
+                "discovery",
+            ],
+        )
+
+    async def async_step_discovery(self, user_input: dict | None = None) -> FlowResult:
+        """Sweep a network for LeoNTP units."""
+        errors: dict = {}
+
+        if user_input is not None:
+            try:
+                network = ipaddress.ip_network(user_input[CONF_NETWORK].strip(), strict = False)
+            except ValueError:
+                errors[CONF_NETWORK] = "invalid_network"
+            else:
+                if network.num_addresses > DISCOVERY_MAX_ADDRESSES:
+                    errors[CONF_NETWORK] = "network_too_large"
+                else:
+                    self.new_entry_data |= {CONF_UPDATE_INTERVAL: user_input[CONF_UPDATE_INTERVAL]}
+                    self.discovered = await self.async_discover(network)
+
+                    if not self.discovered:
+                        return self.async_abort(reason = "no_devices_found")
+
+                    return await self.async_step_discovery_select()
+
+        fields = {
+            vol.Required(CONF_NETWORK): TextSelector(
+                TextSelectorConfig(type = TextSelectorType.TEXT)
+            ),
+            vol.Required(CONF_UPDATE_INTERVAL, default = DEFAULT_UPDATE_INTERVAL): NumberSelector(
+                NumberSelectorConfig(min = 1, max = 3600, step = 1, mode = NumberSelectorMode.BOX)
+            ),
+        }
+
+        return self.async_show_form(
+            step_id = "discovery",
+            data_schema = vol.Schema(fields),
+            errors = errors,
+        )
+
+    async def async_discover(
+        self, network: ipaddress.IPv4Network | ipaddress.IPv6Network
+    ) -> dict[str, str]:
+        """Probe every address of a network at once and return the unconfigured units found."""
+        configured = self._async_current_ids()
+        hosts = [str(address) for address in network.hosts()]
+        poller = LeoNtpFleetPoller(track_late = False)
+
+        try:
+            # One paced burst on one socket, all replies are collected within one timeout.
+            responses = await poller.async_poll(hosts, rate = DISCOVERY_RATE)
+        finally:
+            poller.close()
+
+        discovered: dict[str, str] = {}
+
+        for host, response in responses.items():
+            if isinstance(response, Exception):
+                continue
+
+            try:
+                serial_number = str(decode_status(response.data).serial_number)
+            except LeoNtpServiceException:
+                continue
+
+            if f"{DOMAIN}_{serial_number}" not in configured:
+                discovered.setdefault(serial_number, host)
+
+        log_debug(f"[config_flow|async_discover] {network}: {discovered}")
+
+        return discovered
+
+    async def async_step_discovery_select(self, user_input: dict | None = None) -> FlowResult:
+        """Select the discovered units to add."""
+        errors: dict = {}
+
+        if user_input is not None:
+            if selected := user_input[CONF_DEVICES]:
+                # This flow adds the first unit, every other one gets an import flow of its own.
+                for serial_number in selected[1:]:
+                    self.hass.async_create_task(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context = {"source": SOURCE_IMPORT},
+                            data = self.new_data() | {CONF_HOST: self.discovered[serial_number]},
+                        )
+                    )
+
+                host = self.discovered[selected[0]]
+                self.new_entry_data |= {CONF_HOST: host}
+                self.new_title = f"{host}:{PORT}"
+                await self.async_set_unique_id(f"{DOMAIN}_{selected[0]}")
+                self._abort_if_unique_id_configured()
+                return self.finish_flow()
+
+            errors["base"] = "no_devices_selected"
+
+        fields = {
+            vol.Required(CONF_DEVICES, default = list(self.discovered)): SelectSelector(
+                SelectSelectorConfig(
+                    options = [
+                        SelectOptionDict(value = serial_number, label = f"{host} ({serial_number})")
+                        for serial_number, host in self.discovered.items()
+                    ],
+                    multiple = True,
+                )
+            ),
+        }
+
+        return self.async_show_form(
+            step_id = "discovery_select",
+            data_schema = vol.Schema(fields),
+            errors = errors,
+            description_placeholders = {"count": str(len(self.discovered))},
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Add a unit selected in a network sweep."""
+        test = await self.test_connection(import_data)
+
+        if test["errors"]:
+            return self.async_abort(reason = test["errors"]["base"])
+
+        await self.async_set_unique_id(f"{DOMAIN}_" + test["device"].get("id"))
+        self._abort_if_unique_id_configured()
+        self.new_title = test["device"].get("name")
+        self.new_entry_data |= import_data
+        return self.finish_flow()
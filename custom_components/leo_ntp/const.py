@@ -1,6 +1,4 @@
 """Constants used by LeoNTP."""
-import json
-from pathlib import Path
 from typing import Final
 
 from homeassistant.const import Platform
@@ -10,20 +8,54 @@ SHOW_DEBUG_AS_WARNING = False
 CONF_UPDATE_INTERVAL = "update_interval"
 DEFAULT_UPDATE_INTERVAL = 10
 
+CONF_HEARTBEAT_INTERVAL = "heartbeat_interval"
+DEFAULT_HEARTBEAT_INTERVAL = 0
+
+CONF_DEADBAND = "deadband"
+DEFAULT_DEADBAND = 0.01
+
+CONF_MEASURE_OFFSET = "measure_offset"
+DEFAULT_MEASURE_OFFSET = True
+
+CONF_BURST_SIZE = "burst_size"
+DEFAULT_BURST_SIZE = 1
+
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+DEFAULT_ADAPTIVE_POLLING = False
+
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+DEFAULT_MAX_UPDATE_INTERVAL = 300
+
+CONF_SAMPLE_INTERVAL = "sample_interval"
+DEFAULT_SAMPLE_INTERVAL = 0
+
+CONF_NETWORK = "network"
+CONF_DEVICES = "devices"
+
+# Largest network a discovery sweep probes, a /20
+DISCOVERY_MAX_ADDRESSES = 4096
+# Probes per second sent by a discovery sweep
+DISCOVERY_RATE = 2000
+
+DATA_FLEET_POLLER = "fleet_poller"
+
+STORAGE_VERSION = 1
+# Minimum seconds between two writes of the last known items
+STORAGE_SAVE_INTERVAL = 60
+
 PLATFORMS: Final = [Platform.SENSOR]
 
 ATTRIBUTION: Final = "Data provided by LeoNTP"
 
 PORT = 123
+REQUEST_TIMEOUT = 3
 
-manifestfile = Path(__file__).parent / "manifest.json"
-with open(manifestfile) as json_file:
-    manifest_data = json.load(json_file)
-
-DOMAIN = manifest_data.get("domain")
-NAME = manifest_data.get("name")
-VERSION = manifest_data.get("version")
-ISSUEURL = manifest_data.get("issue_tracker")
+# Kept in sync with manifest.json, the release workflow updates VERSION in both.
+# Reading the manifest here would block the event loop at import.
+DOMAIN = "leo_ntp"
+NAME = "LeoNTP"
+VERSION = "v1.2.0"
+ISSUEURL = "https://github.com/CumpsD/home-assistant-leo-ntp/issues"
 STARTUP = f"""
 -------------------------------------------------------------------
 {NAME}
@@ -0,0 +1,51 @@
+"""Diagnostics support for LeoNTP."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from . import LeoNtpDataUpdateCoordinator
+from .const import DOMAIN
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: LeoNtpDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    now = time.monotonic()
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "state_writes": dict(coordinator.state_writes),
+        "poll_scheduler": {
+            "enabled": coordinator.poll_scheduler.enabled,
+            "exponent": coordinator.poll_scheduler.exponent,
+            "interval": coordinator.poll_scheduler.interval,
+        },
+        "circuit_breaker": {
+            "state": coordinator.client.breaker.state,
+            "failures": coordinator.client.breaker.failures,
+            "time_in_state": round(coordinator.client.breaker.time_in_state(now), 1),
+            "retry_in": round(coordinator.client.breaker.retry_in(now), 1),
+        },
+        "dropped_datagrams": coordinator.client.poller.dropped,
+        "statistics_imported": coordinator.statistics.imported,
+        "sample_files": {
+            device_key: {
+                "records": sample_file.count,
+                "capacity": sample_file.capacity,
+                "first": sample_file.first,
+                "last": sample_file.last,
+            }
+            for device_key, sample_file in coordinator.sample_files.items()
+            if sample_file is not None
+        },
+    }
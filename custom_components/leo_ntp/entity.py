@@ -1,6 +1,7 @@
 """Base LeoNTP entity."""
 
 from datetime import datetime
+import time
 
 from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceEntryType
@@ -18,6 +19,18 @@ from .models import LeoNtpItem
 from .utils import log_debug
 from .utils import sensor_name
 
+# Attributes that move on nearly every poll, written with the state or the heartbeat only
+UNTRACKED_ATTRIBUTES = frozenset({"samples", "allan_deviation"})
+
+
+def _value_changed(value, previous, deadband: float) -> bool:
+    """Return if a value differs from the previous one by more than the deadband."""
+    if deadband and isinstance(value, int | float) and isinstance(previous, int | float):
+        return abs(value - previous) > deadband
+
+    return value != previous
+
+
 class LeoNtpEntity(CoordinatorEntity[LeoNtpDataUpdateCoordinator]):
     """Base LeoNTP entity."""
 
@@ -49,6 +62,11 @@ class LeoNtpEntity(CoordinatorEntity[LeoNtpDataUpdateCoordinator]):
         self._key = self.item.key
         self.client = coordinator.client
         self.last_synced = datetime.now()
+        # The state is written when the entity is added, track it for change-only writes.
+        self._last_written_state = item.state
+        self._last_written_attributes = dict(item.extra_attributes)
+        self._last_written_at = time.monotonic()
+        self._last_written_stale = coordinator.stale
         self._attr_name = sensor_name(self.item.name)
         self._item = item
         log_debug(f"[entity|init] {self._key}")
@@ -56,19 +74,59 @@ class LeoNtpEntity(CoordinatorEntity[LeoNtpDataUpdateCoordinator]):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        if len(self.coordinator.data):
-            for item in self.coordinator.data:
-                item = self.coordinator.data[item]
-                if self._key == item.key:
-                    self.last_synced = datetime.now()
-                    self._item = item
-                    self.async_write_ha_state()
-                    return
+        if self.coordinator.data and (item := self.coordinator.data.get(self._key)):
+            self._item = item
+
+            if self._should_write_state(item.state, item.extra_attributes):
+                self.last_synced = datetime.now()
+                self.coordinator.state_writes["emitted"] += 1
+                self.async_write_ha_state()
+            else:
+                self.coordinator.state_writes["suppressed"] += 1
+            return
 
         log_debug(
             f"[entity|_handle_coordinator_update] {self._attr_unique_id}: async_write_ha_state ignored since API fetch failed or not found",
         )
 
+    def _should_write_state(self, state, attributes: dict) -> bool:
+        """Return if a state or its attributes differ enough from the last written ones to be written.
+
+        The configured deadband applies to the state and to numeric attributes
+        alike, UNTRACKED_ATTRIBUTES are left to the heartbeat. The last_synced
+        attribute is the time of the last write.
+        """
+        now = time.monotonic()
+        previous = self._last_written_state
+        deadband = self.coordinator.deadband if getattr(self.entity_description, "deadband", False) else 0
+        heartbeat = self.coordinator.heartbeat_interval
+        stale = self.coordinator.stale
+
+        if heartbeat and now - self._last_written_at >= heartbeat:
+            changed = True
+        elif stale != self._last_written_stale:
+            changed = True
+        elif attributes.keys() != self._last_written_attributes.keys():
+            changed = True
+        elif attributes.get("window_min") != attributes.get("window_max"):
+            # The value moved within the publish window, e.g. a GPS lock glitch.
+            changed = True
+        else:
+            changed = _value_changed(state, previous, deadband) or any(
+                _value_changed(value, self._last_written_attributes[name], deadband)
+                for name, value in attributes.items()
+                if name not in UNTRACKED_ATTRIBUTES
+            )
+
+        if changed:
+            self._last_written_state = state
+            # Attribute dicts are updated in place, keep a copy of the written values.
+            self._last_written_attributes = dict(attributes)
+            self._last_written_at = now
+            self._last_written_stale = stale
+
+        return changed
+
     @property
     def item(self) -> LeoNtpItem:
         """Return the item for this entity."""
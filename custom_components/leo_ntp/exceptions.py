@@ -12,3 +12,9 @@ class LeoNtpServiceException(Exception):
 
     pass
 
+
+
+class LeoNtpCircuitOpenException(LeoNtpServiceException):
+    """Raised instead of polling a unit while its circuit breaker is open."""
+
+    pass
@@ -0,0 +1,236 @@
+"""Rolling sample history for LeoNTP."""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+import math
+
+# Number of samples kept per device
+HISTORY_SIZE = 600
+
+# Averaging factors, in samples, the Allan deviation is reported for
+ALLAN_AVERAGING_FACTORS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+# Time constant, in seconds, of the smoothed counter rate
+RATE_TIME_CONSTANT = 60
+
+
+class LeoNtpRollingStats:
+    """Fixed-size ring buffer with O(1) rolling mean, min, max and standard deviation."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize the ring buffer."""
+        self.size = size
+        self.values = array("d", bytes(8 * size))
+        self.count = 0
+        self._index = 0
+        self._added = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        # Monotonic queues of (sample number, value) holding the window minimum and maximum
+        self._min: deque[tuple[int, float]] = deque()
+        self._max: deque[tuple[int, float]] = deque()
+
+    def add(self, value: float) -> None:
+        """Add a sample, evicting the oldest one once the buffer is full."""
+        if self.count == self.size:
+            old = self.values[self._index]
+            self._sum -= old
+            self._sum_sq -= old * old
+        else:
+            self.count += 1
+
+        self.values[self._index] = value
+        self._sum += value
+        self._sum_sq += value * value
+        self._index = (self._index + 1) % self.size
+
+        # Recompute the sums once per lap so floating point drift cannot accumulate.
+        if self._index == 0:
+            self._sum = math.fsum(self.values)
+            self._sum_sq = math.fsum(v * v for v in self.values)
+
+        sample = self._added
+        self._added += 1
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((sample, value))
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((sample, value))
+
+        if self._min[0][0] <= sample - self.size:
+            self._min.popleft()
+        if self._max[0][0] <= sample - self.size:
+            self._max.popleft()
+
+    def last(self, age: int = 0) -> float:
+        """Return the sample added age samples before the most recent one."""
+        return self.values[(self._index - 1 - age) % self.size]
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the window."""
+        return self._sum / self.count if self.count else None
+
+    @property
+    def min(self) -> float | None:
+        """Return the minimum of the window."""
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> float | None:
+        """Return the maximum of the window."""
+        return self._max[0][1] if self._max else None
+
+    @property
+    def stddev(self) -> float | None:
+        """Return the sample standard deviation of the window."""
+        if self.count < 2:
+            return None
+
+        variance = (self._sum_sq - self._sum * self._sum / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class LeoNtpAllanDeviation:
+    """Rolling overlapping Allan deviation of phase samples, updated in O(1) per tau.
+
+    Second differences are only taken over phases sampled at the same
+    interval, a new sample interval starts the deviation over.
+    """
+
+    def __init__(self, phases: LeoNtpRollingStats, averaging_factors: tuple[int, ...]) -> None:
+        """Initialize the Allan deviation over the phase ring buffer."""
+        self.phases = phases
+        self.averaging_factors = tuple(
+            factor for factor in averaging_factors if 2 * factor < phases.size
+        )
+        self.sample_interval: float | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop the second differences taken so far."""
+        # Phases added since the reset
+        self._samples = 0
+        # Per averaging factor, a ring buffer of squared second differences
+        self._terms = {
+            factor: LeoNtpRollingStats(self.phases.size - 2 * factor)
+            for factor in self.averaging_factors
+        }
+
+    def update(self, sample_interval: float) -> None:
+        """Account for the phase sample that was just added, taken sample_interval seconds after the previous one."""
+        phases = self.phases
+
+        if sample_interval != self.sample_interval:
+            self.sample_interval = sample_interval
+            self.reset()
+
+        self._samples += 1
+
+        for factor, terms in self._terms.items():
+            if self._samples > 2 * factor:
+                second_difference = (
+                    phases.last() - 2 * phases.last(factor) + phases.last(2 * factor)
+                )
+                terms.add(second_difference * second_difference)
+
+    def deviations(self) -> dict[float, float]:
+        """Return the Allan deviation by tau in seconds."""
+        result = {}
+
+        for factor, terms in self._terms.items():
+            if terms.count:
+                tau = factor * self.sample_interval
+                result[tau] = math.sqrt(max(terms.mean, 0.0) / (2 * tau * tau))
+
+        return result
+
+
+class LeoNtpHistory:
+    """Rolling offset and delay statistics of one LeoNTP device."""
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        """Initialize the device history."""
+        self.offset = LeoNtpRollingStats(size)
+        self.delay = LeoNtpRollingStats(size)
+        self.allan_deviation = LeoNtpAllanDeviation(self.offset, ALLAN_AVERAGING_FACTORS)
+
+    def add(self, offset: float, delay: float, sample_interval: float) -> None:
+        """Add an offset and delay sample, in seconds, taken sample_interval seconds after the previous one."""
+        self.offset.add(offset)
+        self.delay.add(delay)
+        self.allan_deviation.update(sample_interval)
+
+
+class LeoNtpCounterRate:
+    """Per second rate of a wrapping 32-bit counter, instantaneous and smoothed."""
+
+    def __init__(self, time_constant: float = RATE_TIME_CONSTANT) -> None:
+        """Initialize the counter rate."""
+        self.time_constant = time_constant
+        self.rate: float | None = None
+        self.average: float | None = None
+        self._count: int | None = None
+        self._uptime: int | None = None
+        self._time: float | None = None
+
+    def update(self, count: int, uptime: int, now: float) -> None:
+        """Add a counter reading taken at monotonic time now."""
+        previous_count, previous_uptime, previous_time = self._count, self._uptime, self._time
+        self._count, self._uptime, self._time = count, uptime, now
+
+        # An uptime going backwards means the appliance rebooted and reset its counters.
+        if previous_count is None or uptime < previous_uptime or now <= previous_time:
+            return
+
+        elapsed = now - previous_time
+        self.rate = ((count - previous_count) & 0xFFFFFFFF) / elapsed
+
+        if self.average is None:
+            self.average = self.rate
+        else:
+            self.average += (1 - math.exp(-elapsed / self.time_constant)) * (self.rate - self.average)
+
+
+class LeoNtpWindowStats:
+    """Min, max, mean and last of the samples taken since the last publish."""
+
+    __slots__ = ("count", "total", "min", "max", "last")
+
+    def __init__(self) -> None:
+        """Initialize an empty window."""
+        self.reset()
+
+    def add(self, value: float) -> None:
+        """Add a sample to the window."""
+        if self.count == 0:
+            self.min = self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+
+        self.count += 1
+        self.total += value
+        self.last = value
+
+    def publish(self, attributes: dict) -> None:
+        """Write the window aggregates into an attributes dict and start a new window."""
+        if self.count:
+            attributes["window_min"] = self.min
+            attributes["window_max"] = self.max
+            attributes["window_mean"] = round(self.total / self.count, 3)
+            attributes["window_last"] = self.last
+
+        attributes["window_samples"] = self.count
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new, empty window."""
+        self.count = 0
+        self.total = 0.0
+        self.min = self.max = self.last = None
@@ -9,11 +9,21 @@ class LeoNtpConfigEntryData(TypedDict):
 
     host: str | None
     update_interval: int | None
+    heartbeat_interval: int | None
+    deadband: float | None
+    measure_offset: bool | None
+    burst_size: int | None
+    adaptive_polling: bool | None
+    max_update_interval: int | None
+    sample_interval: float | None
 
 
-@dataclass
+@dataclass(slots = True)
 class LeoNtpItem:
-    """LeoNTP item model."""
+    """LeoNTP item model.
+
+    Items are built once per device, only state and extra_attributes change between polls.
+    """
 
     name: str = ""
     key: str = ""
@@ -0,0 +1,119 @@
+"""LeoNTP packet encoding and decoding."""
+from __future__ import annotations
+
+import struct
+from typing import NamedTuple
+
+from .exceptions import LeoNtpServiceException
+
+STATUS_PACKET_SIZE = 48
+NTP_PACKET_SIZE = 48
+
+MODE_CLIENT = 3
+MODE_SERVER = 4
+MODE_PRIVATE = 7
+
+# reference time (in seconds since 1900-01-01 00:00:00) for conversion from NTP time to system time
+TIME1970 = 2208988800
+
+# LeoNTP status request: NTP version 4, mode 7 (private), LeoNTP query code 0x10
+STATUS_REQUEST = bytes([4 << 3 | MODE_PRIVATE, 0, 0x10, 1]) + bytes(STATUS_PACKET_SIZE - 4)
+
+# Little-endian status payload following the 16 byte header
+STATUS_STRUCT = struct.Struct("<16xIIIIIIBBHI")
+
+# Big-endian NTP header, timestamps as 32.32 fixed point integers
+NTP_STRUCT = struct.Struct("!BBbbIII4Q")
+
+
+class LeoNtpStatus(NamedTuple):
+    """Decoded LeoNTP status response."""
+
+    ref_fraction: int
+    ref_seconds: int
+    uptime: int
+    ntp_served: int
+    cmd_served: int
+    gps_lock_time: int
+    gps_flags: int
+    gps_satellites: int
+    serial_number: int
+    firmware_version: int
+
+
+def decode_status(packet: bytes | bytearray | memoryview, offset: int = 0) -> LeoNtpStatus:
+    """Decode a LeoNTP status response in place, without slicing the buffer."""
+    if len(packet) - offset < STATUS_PACKET_SIZE:
+        raise LeoNtpServiceException(
+            f"Status response too short: {len(packet) - offset} bytes"
+        )
+
+    # Equivalent to LeoNtpStatus._make() without the classmethod and length check overhead.
+    return tuple.__new__(LeoNtpStatus, STATUS_STRUCT.unpack_from(packet, offset))
+
+
+class LeoNtpTime(NamedTuple):
+    """Decoded NTP server response, timestamps in NTP 32.32 fixed point."""
+
+    leap_version_mode: int
+    stratum: int
+    poll: int
+    precision: int
+    root_delay: int
+    root_dispersion: int
+    reference_id: int
+    reference: int
+    origin: int
+    receive: int
+    transmit: int
+
+
+def encode_client_request(transmit: int) -> bytes:
+    """Build a standard NTP version 4 client (mode 3) request."""
+    return NTP_STRUCT.pack(4 << 3 | MODE_CLIENT, 0, 0, 0, 0, 0, 0, 0, 0, 0, transmit)
+
+
+def decode_time(packet: bytes | bytearray | memoryview, offset: int = 0) -> LeoNtpTime:
+    """Decode an NTP server response in place, without slicing the buffer."""
+    if len(packet) - offset < NTP_PACKET_SIZE:
+        raise LeoNtpServiceException(
+            f"NTP response too short: {len(packet) - offset} bytes"
+        )
+
+    return tuple.__new__(LeoNtpTime, NTP_STRUCT.unpack_from(packet, offset))
+
+
+def valid_response(response: bytes) -> bool:
+    """Return if a datagram is long enough and carries an NTP version and a reply mode."""
+    return (
+        len(response) >= NTP_PACKET_SIZE
+        and 1 <= response[0] >> 3 & 7 <= 4
+        and response[0] & 7 in (MODE_SERVER, MODE_PRIVATE)
+    )
+
+
+def reply_mode(request: bytes) -> int:
+    """Return the mode of the response expected for a request."""
+    mode = request[0] & 7
+    return MODE_SERVER if mode == MODE_CLIENT else mode
+
+
+def request_token(request: bytes) -> bytes | None:
+    """Return the bytes the response to a request will echo, if any."""
+    # Servers copy the transmit timestamp of a client request into the origin timestamp.
+    return request[40:48] if request[0] & 7 == MODE_CLIENT else None
+
+
+def response_token(response: bytes) -> bytes | None:
+    """Return the request bytes echoed by a response, if any."""
+    return response[24:32] if response[0] & 7 == MODE_SERVER else None
+
+
+def ntp_to_unix(timestamp: int) -> float:
+    """Convert an NTP 32.32 fixed point timestamp to seconds since the Unix epoch."""
+    return (timestamp >> 32) - TIME1970 + (timestamp & 0xFFFFFFFF) / 4294967296.0
+
+
+def unix_to_ntp(seconds: float) -> int:
+    """Convert seconds since the Unix epoch to an NTP 32.32 fixed point timestamp."""
+    return int((seconds + TIME1970) * 4294967296.0) & 0xFFFFFFFFFFFFFFFF
@@ -0,0 +1,226 @@
+"""Memory-mapped ring file of raw LeoNTP samples."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+import json
+import math
+import mmap
+import os
+import struct
+from typing import NamedTuple
+
+# Days of samples kept per device
+SAMPLE_FILE_DAYS = 7
+
+# Upper bound of records per file, about 40 MB
+SAMPLE_FILE_MAX_RECORDS = 1 << 20
+
+SAMPLE_FILE_MAGIC = b"LNTP"
+SAMPLE_FILE_VERSION = 1
+
+# Magic, version, record size, capacity, next record index, record count
+HEADER_STRUCT = struct.Struct("<4sHHIQQ4x")
+
+# Unix time, offset and delay in ms (NaN when not measured), satellites,
+# GPS flags, NTP requests served, uptime and GPS lock time
+RECORD_STRUCT = struct.Struct("<dddBBxxIII")
+TIME_STRUCT = struct.Struct("<d")
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+
+class LeoNtpSample(NamedTuple):
+    """Raw sample of one LeoNTP poll."""
+
+    time: float
+    offset: float
+    delay: float
+    satellites: int
+    gps_flags: int
+    ntp_served: int
+    uptime: int
+    gps_lock_time: int
+
+
+def sample_file_capacity(sample_interval: float) -> int:
+    """Return the number of records covering SAMPLE_FILE_DAYS at a sample interval."""
+    return min(math.ceil(SAMPLE_FILE_DAYS * 86400 / sample_interval), SAMPLE_FILE_MAX_RECORDS)
+
+
+def _read_header(fd: int) -> tuple[int, int, int] | None:
+    """Return the capacity, next record index and record count of a ring file, None when its layout differs."""
+    header = os.pread(fd, HEADER_STRUCT.size, 0)
+
+    if len(header) != HEADER_STRUCT.size:
+        return None
+
+    magic, version, record_size, capacity, next_index, count = HEADER_STRUCT.unpack(header)
+
+    if (
+        (magic, version, record_size) != (SAMPLE_FILE_MAGIC, SAMPLE_FILE_VERSION, RECORD_STRUCT.size)
+        or not 0 < capacity <= SAMPLE_FILE_MAX_RECORDS
+        or next_index >= capacity
+        or count > capacity
+        or os.fstat(fd).st_size != HEADER_STRUCT.size + capacity * RECORD_STRUCT.size
+    ):
+        return None
+
+    return capacity, next_index, count
+
+
+def _read_newest(fd: int, capacity: int, next_index: int, count: int) -> bytes:
+    """Return the newest count records of a ring file, oldest first."""
+    oldest = (next_index - count) % capacity
+    first = min(count, capacity - oldest)
+    records = os.pread(fd, first * RECORD_STRUCT.size, HEADER_STRUCT.size + oldest * RECORD_STRUCT.size)
+
+    if count > first:
+        records += os.pread(fd, (count - first) * RECORD_STRUCT.size, HEADER_STRUCT.size)
+
+    return records
+
+
+class LeoNtpSampleFile:
+    """Fixed-size ring of fixed-size sample records in a memory-mapped file.
+
+    Appends write one record and the header in place, the file never grows.
+    Records are appended in time order, so a time range is found by bisection.
+    """
+
+    def __init__(self, path: str, capacity: int) -> None:
+        """Open the ring file, creating it when missing. Blocking.
+
+        A file of another capacity keeps its newest records, a file of another
+        layout is reset.
+        """
+        self.path = path
+        self.capacity = capacity
+        size = HEADER_STRUCT.size + capacity * RECORD_STRUCT.size
+        records = b""
+
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        try:
+            header = _read_header(fd)
+
+            if header is not None and header[0] == capacity:
+                _, self._next, self.count = header
+            else:
+                if header is not None:
+                    # Another interval sizes the ring differently, keep the newest records.
+                    file_capacity, next_index, count = header
+                    records = _read_newest(fd, file_capacity, next_index, min(count, capacity))
+
+                self._next = self.count = 0
+
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, size)
+
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        if header is None or header[0] != capacity:
+            self._map[HEADER_STRUCT.size:HEADER_STRUCT.size + len(records)] = records
+            self.count = len(records) // RECORD_STRUCT.size
+            self._next = self.count % capacity
+            self._write_header()
+
+    def _write_header(self) -> None:
+        """Write the header in place."""
+        HEADER_STRUCT.pack_into(
+            self._map,
+            0,
+            SAMPLE_FILE_MAGIC,
+            SAMPLE_FILE_VERSION,
+            RECORD_STRUCT.size,
+            self.capacity,
+            self._next,
+            self.count,
+        )
+
+    def append(self, *sample) -> None:
+        """Append a sample, overwriting the oldest one once the ring is full."""
+        RECORD_STRUCT.pack_into(
+            self._map, HEADER_STRUCT.size + self._next * RECORD_STRUCT.size, *sample
+        )
+        self._next = (self._next + 1) % self.capacity
+
+        if self.count < self.capacity:
+            self.count += 1
+
+        self._write_header()
+
+    def _offset(self, oldest: int, position: int) -> int:
+        """Return the file offset of the record at a position counted from the oldest one."""
+        return HEADER_STRUCT.size + (oldest + position) % self.capacity * RECORD_STRUCT.size
+
+    def _time(self, oldest: int, position: int) -> float:
+        """Return the time of the record at a position counted from the oldest one."""
+        return TIME_STRUCT.unpack_from(self._map, self._offset(oldest, position))[0]
+
+    def samples(self, start: float = -math.inf, end: float = math.inf) -> Iterator[LeoNtpSample]:
+        """Yield the samples taken from start up to end, oldest first, one record at a time."""
+        # Snapshot the ring so appends while iterating only overwrite, never shift, records.
+        count = self.count
+        oldest = self._next - count
+        low, high = 0, count
+
+        while low < high:
+            middle = (low + high) // 2
+
+            if self._time(oldest, middle) < start:
+                low = middle + 1
+            else:
+                high = middle
+
+        for position in range(low, count):
+            sample = tuple.__new__(
+                LeoNtpSample, RECORD_STRUCT.unpack_from(self._map, self._offset(oldest, position))
+            )
+
+            if sample.time > end:
+                return
+
+            yield sample
+
+    @property
+    def first(self) -> float | None:
+        """Return the time of the oldest sample."""
+        return self._time(self._next - self.count, 0) if self.count else None
+
+    @property
+    def last(self) -> float | None:
+        """Return the time of the newest sample."""
+        return self._time(self._next - self.count, self.count - 1) if self.count else None
+
+    def export(self, path: str, export_format: str, start: float = -math.inf, end: float = math.inf) -> int:
+        """Stream the samples of a time range to a CSV or NDJSON file and return their number. Blocking."""
+        exported = 0
+
+        with open(path, "w", encoding = "utf-8", newline = "") as file:
+            if export_format == "csv":
+                file.write(",".join(LeoNtpSample._fields) + "\n")
+
+            for sample in self.samples(start, end):
+                if export_format == "csv":
+                    file.write(",".join("" if value != value else repr(value) for value in sample) + "\n")
+                else:
+                    file.write(
+                        json.dumps(
+                            {
+                                field: None if value != value else value
+                                for field, value in zip(LeoNtpSample._fields, sample, strict = True)
+                            }
+                        )
+                        + "\n"
+                    )
+                exported += 1
+
+        return exported
+
+    def close(self) -> None:
+        """Flush and unmap the file. Blocking."""
+        self._map.flush()
+        self._map.close()
@@ -0,0 +1,102 @@
+"""Adaptive poll scheduling for LeoNTP."""
+from __future__ import annotations
+
+# Consecutive stable polls before the poll interval is doubled
+STABLE_POLLS = 4
+
+# Jitter, in seconds, always considered stable
+JITTER_TOLERANCE = 0.001
+
+# Satellite count below which GPS reception is considered degraded
+MIN_SATELLITES = 4
+
+
+class LeoNtpPollScheduler:
+    """Adaptive poll interval, in the style of the ntpd poll exponent.
+
+    The interval doubles after every STABLE_POLLS stable polls, up to the
+    maximum, and drops back to the minimum as soon as a poll is unstable.
+    Stability is judged against the lowest jitter and the highest satellite
+    count seen since the interval last dropped back, so a gradual degradation
+    counts as unstable too.
+    """
+
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        enabled: bool = False,
+    ) -> None:
+        """Initialize the poll scheduler."""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.enabled = enabled
+        self.exponent = 0
+        self._stable_polls = 0
+        # Baseline since the last drop back to the minimum interval
+        self._satellites: int | None = None
+        self._jitter: float | None = None
+
+    @property
+    def interval(self) -> float:
+        """Return the current poll interval in seconds."""
+        if not self.enabled:
+            return self.min_interval
+
+        return max(self.min_interval, min(self.min_interval * 2**self.exponent, self.max_interval))
+
+    def update(
+        self,
+        gps_lock: bool,
+        satellites: int,
+        jitter: float | None,
+        jitter_required: bool = False,
+    ) -> float:
+        """Account for a successful poll and return the next poll interval.
+
+        With jitter_required a poll without a jitter, a failed offset
+        measurement, is unstable.
+        """
+        if jitter is None:
+            jitter_stable = not jitter_required
+        else:
+            jitter_stable = (
+                jitter <= JITTER_TOLERANCE
+                or (self._jitter is not None and jitter <= 2 * self._jitter)
+            )
+
+        stable = (
+            gps_lock
+            and satellites >= MIN_SATELLITES
+            and (self._satellites is None or satellites >= self._satellites - 1)
+            and jitter_stable
+        )
+
+        if not stable:
+            # The polls that follow are judged against this one.
+            interval = self.reset()
+            self._satellites = satellites
+            self._jitter = jitter
+            return interval
+
+        # Keep the best values since the last reset, a slow degradation does not move them.
+        self._satellites = satellites if self._satellites is None else max(self._satellites, satellites)
+
+        if jitter is not None:
+            self._jitter = jitter if self._jitter is None else min(self._jitter, jitter)
+
+        self._stable_polls += 1
+
+        if self._stable_polls >= STABLE_POLLS and self.interval < self.max_interval:
+            self.exponent += 1
+            self._stable_polls = 0
+
+        return self.interval
+
+    def reset(self) -> float:
+        """Drop back to the minimum poll interval and return it."""
+        self.exponent = 0
+        self._stable_polls = 0
+        self._satellites = None
+        self._jitter = None
+        return self.interval
@@ -4,10 +4,14 @@ from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
 
+from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.sensor import SensorEntityDescription
+from homeassistant.components.sensor import SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfTime
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers.entity import EntityDescription
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
@@ -24,21 +28,42 @@ class LeoNtpSensorDescription(SensorEntityDescription):
     """Class to describe a LeoNTP sensor."""
 
     value_fn: Callable[[Any], StateType] | None = None
+    # Numeric changes up to the configured deadband do not trigger a state write
+    deadband: bool = False
 
 
 SENSOR_DESCRIPTIONS: list[SensorEntityDescription] = [
     LeoNtpSensorDescription(
         key = "utc_time",
-        icon = "mdi:clock-digital"
+        icon = "mdi:clock-digital",
+        device_class = SensorDeviceClass.TIMESTAMP,
+        entity_registry_enabled_default = False,
     ),
     LeoNtpSensorDescription(
         key = "ntp_time",
-        icon = "mdi:clock-digital"
+        icon = "mdi:clock-digital",
+        native_unit_of_measurement = UnitOfTime.SECONDS,
+        suggested_display_precision = 3,
+        entity_registry_enabled_default = False,
     ),
     LeoNtpSensorDescription(
         key = "requests_served",
         icon = "mdi:account-search-outline"
     ),
+    LeoNtpSensorDescription(
+        key = "request_rate",
+        icon = "mdi:speedometer",
+        native_unit_of_measurement = "req/s",
+        state_class = SensorStateClass.MEASUREMENT,
+        suggested_display_precision = 1,
+    ),
+    LeoNtpSensorDescription(
+        key = "request_rate_average",
+        icon = "mdi:speedometer-medium",
+        native_unit_of_measurement = "req/s",
+        state_class = SensorStateClass.MEASUREMENT,
+        suggested_display_precision = 1,
+    ),
     LeoNtpSensorDescription(
         key = "uptime",
         icon = "mdi:timer-sand"
@@ -51,6 +76,16 @@ SENSOR_DESCRIPTIONS: list[SensorEntityDescription] = [
         key = "gps_lock_time",
         icon = "mdi:timer-lock-open-outline"
     ),
+    LeoNtpSensorDescription(
+        key = "boot_time",
+        icon = "mdi:restart",
+        device_class = SensorDeviceClass.TIMESTAMP,
+    ),
+    LeoNtpSensorDescription(
+        key = "gps_lock_since",
+        icon = "mdi:lock-clock",
+        device_class = SensorDeviceClass.TIMESTAMP,
+    ),
     LeoNtpSensorDescription(
         key = "gps_flags",
         icon = "mdi:file-certificate-outline"
@@ -67,6 +102,38 @@ SENSOR_DESCRIPTIONS: list[SensorEntityDescription] = [
         key = "serial_number",
         icon = "mdi:tag-text"
     ),
+    LeoNtpSensorDescription(
+        key = "offset",
+        icon = "mdi:clock-fast",
+        native_unit_of_measurement = UnitOfTime.MILLISECONDS,
+        state_class = SensorStateClass.MEASUREMENT,
+        suggested_display_precision = 3,
+        deadband = True,
+    ),
+    LeoNtpSensorDescription(
+        key = "delay",
+        icon = "mdi:timer-outline",
+        native_unit_of_measurement = UnitOfTime.MILLISECONDS,
+        state_class = SensorStateClass.MEASUREMENT,
+        suggested_display_precision = 3,
+        deadband = True,
+    ),
+    LeoNtpSensorDescription(
+        key = "offset_spread",
+        icon = "mdi:arrow-expand-horizontal",
+        native_unit_of_measurement = UnitOfTime.MILLISECONDS,
+        state_class = SensorStateClass.MEASUREMENT,
+        suggested_display_precision = 3,
+        deadband = True,
+    ),
+    LeoNtpSensorDescription(
+        key = "jitter",
+        icon = "mdi:chart-bell-curve",
+        native_unit_of_measurement = UnitOfTime.MILLISECONDS,
+        state_class = SensorStateClass.MEASUREMENT,
+        suggested_display_precision = 3,
+        deadband = True,
+    ),
 ]
 
 
@@ -78,7 +145,8 @@ async def async_setup_entry(
     """Set up the LeoNTP sensors."""
     log_debug("[sensor|async_setup_entry|async_add_entities|start]")
     coordinator: LeoNtpDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    entities: list[LeoNtpSensor] = []
+    known_keys: set[str] = set()
+    last_data: dict[str, LeoNtpItem] | None = None
 
     SUPPORTED_KEYS = {
         description.key: description for description in SENSOR_DESCRIPTIONS
@@ -86,9 +154,25 @@ async def async_setup_entry(
 
     # log_debug(f"[sensor|async_setup_entry|async_add_entities|SUPPORTED_KEYS] {SUPPORTED_KEYS}")
 
-    if coordinator.data is not None:
-        for item in coordinator.data:
-            item = coordinator.data[item]
+    @callback
+    def _async_add_new_entities() -> None:
+        """Add entities for items the coordinator has not reported before."""
+        nonlocal last_data
+
+        # The coordinator data only changes identity when its devices change.
+        if not coordinator.data or coordinator.data is last_data:
+            return
+
+        last_data = coordinator.data
+        # Entities of devices that disappeared were removed with their device.
+        known_keys.intersection_update(coordinator.data)
+        entities: list[LeoNtpSensor] = []
+
+        for item in coordinator.data.values():
+            if item.key in known_keys:
+                continue
+
+            known_keys.add(item.key)
 
             if description := SUPPORTED_KEYS.get(item.type):
                 if item.native_unit_of_measurement is not None:
@@ -102,7 +186,12 @@ async def async_setup_entry(
                     value_fn = description.value_fn,
                     native_unit_of_measurement = native_unit_of_measurement,
                     icon = description.icon,
+                    device_class = description.device_class,
+                    entity_registry_enabled_default = description.entity_registry_enabled_default,
                     translation_key = description.translation_key,
+                    state_class = description.state_class,
+                    suggested_display_precision = description.suggested_display_precision,
+                    deadband = description.deadband,
                 )
 
                 log_debug(f"[sensor|async_setup_entry|adding] {item.name}")
@@ -119,7 +208,11 @@ async def async_setup_entry(
                     True,
                 )
 
-        async_add_entities(entities)
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_new_entities()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_entities))
 
 
 class LeoNtpSensor(LeoNtpEntity, SensorEntity):
@@ -165,6 +258,10 @@ class LeoNtpSensor(LeoNtpEntity, SensorEntity):
             "last_synced": self.last_synced,
         }
 
+        # Restored from the last run, not polled since
+        if self.coordinator.stale:
+            attributes["stale"] = True
+
         if len(self.item.extra_attributes) > 0:
             for attr in self.item.extra_attributes:
                 attributes[attr] = self.item.extra_attributes[attr]
@@ -0,0 +1,80 @@
+"""LeoNTP services."""
+from __future__ import annotations
+
+import math
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+from homeassistant.core import ServiceCall
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN
+from .samples import EXPORT_FORMATS
+from .utils import log_debug
+
+SERVICE_EXPORT_SAMPLES = "export_samples"
+
+ATTR_DEVICE_ID = "device_id"
+ATTR_FILENAME = "filename"
+ATTR_FORMAT = "format"
+ATTR_START = "start"
+ATTR_END = "end"
+
+EXPORT_SAMPLES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Required(ATTR_FILENAME): cv.string,
+        vol.Optional(ATTR_FORMAT, default = "csv"): vol.In(EXPORT_FORMATS),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the LeoNTP services."""
+
+    async def async_export_samples(call: ServiceCall) -> None:
+        """Export the raw samples of a device in a time range to a file."""
+        filename = call.data[ATTR_FILENAME]
+
+        if not hass.config.is_allowed_path(filename):
+            raise HomeAssistantError(f"Cannot write to {filename}, it is not an allowed path")
+
+        if (device := dr.async_get(hass).async_get(call.data[ATTR_DEVICE_ID])) is None:
+            raise HomeAssistantError(f"Unknown device {call.data[ATTR_DEVICE_ID]}")
+
+        device_keys = {identifier for domain, identifier in device.identifiers if domain == DOMAIN}
+        sample_file = next(
+            (
+                sample_file
+                for coordinator in hass.data.get(DOMAIN, {}).values()
+                for device_key, sample_file in getattr(coordinator, "sample_files", {}).items()
+                if device_key in device_keys and sample_file is not None
+            ),
+            None,
+        )
+
+        if sample_file is None:
+            raise HomeAssistantError(f"No samples recorded for {device.name}")
+
+        start = dt_util.as_utc(call.data[ATTR_START]).timestamp() if ATTR_START in call.data else -math.inf
+        end = dt_util.as_utc(call.data[ATTR_END]).timestamp() if ATTR_END in call.data else math.inf
+        exported = await hass.async_add_executor_job(
+            sample_file.export, filename, call.data[ATTR_FORMAT], start, end
+        )
+
+        log_debug(f"[services|async_export_samples] {exported} samples of {device.name} to {filename}")
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_SAMPLES,
+        async_export_samples,
+        schema = EXPORT_SAMPLES_SCHEMA,
+    )
@@ -0,0 +1,139 @@
+"""Long-term statistics import for LeoNTP."""
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timezone
+from typing import TYPE_CHECKING
+
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+
+from .const import DOMAIN
+from .history import LeoNtpWindowStats
+from .models import LeoNtpItem
+from .utils import log_debug
+
+# The recorder pulls in SQLAlchemy, it is only imported once an hour is imported.
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticData
+    from homeassistant.components.recorder.models import StatisticMetaData
+
+# Item types imported as hourly statistics, with their units
+STATISTICS_ITEM_TYPES = {
+    "offset": UnitOfTime.MILLISECONDS,
+    "delay": UnitOfTime.MILLISECONDS,
+    "satellites": None,
+    "request_rate": "req/s",
+}
+
+# Seconds per bucket, bucket means are weighted equally in the hourly mean
+BUCKET_SECONDS = 300
+
+# Seconds per imported statistics period
+HOUR_SECONDS = 3600
+
+
+class LeoNtpHourlyStatistic:
+    """Hourly mean, min and max of an item, built from 5 minute buckets.
+
+    Averaging bucket means instead of raw samples keeps the hourly mean time
+    weighted when the poll interval changes within the hour.
+    """
+
+    __slots__ = ("metadata", "bucket", "bucket_start", "hour_start", "means", "buckets", "min", "max")
+
+    def __init__(self, metadata: StatisticMetaData) -> None:
+        """Initialize the hourly statistic."""
+        self.metadata = metadata
+        self.bucket = LeoNtpWindowStats()
+        self.bucket_start: float | None = None
+        self.hour_start: float | None = None
+        self._reset_hour()
+
+    def _reset_hour(self) -> None:
+        """Start a new, empty hour."""
+        self.means = 0.0
+        self.buckets = 0
+        self.min = self.max = None
+
+    def _close_bucket(self) -> None:
+        """Fold the current bucket into the hour."""
+        bucket = self.bucket
+
+        if bucket.count:
+            self.means += bucket.total / bucket.count
+            self.buckets += 1
+            self.min = bucket.min if self.min is None else min(self.min, bucket.min)
+            self.max = bucket.max if self.max is None else max(self.max, bucket.max)
+
+        bucket.reset()
+
+    def add(self, value: float, now: float) -> StatisticData | None:
+        """Add a sample taken at Unix time now, returning the statistics of an hour it completes."""
+        result: StatisticData | None = None
+        bucket_start = now - now % BUCKET_SECONDS
+
+        if bucket_start != self.bucket_start:
+            self._close_bucket()
+            self.bucket_start = bucket_start
+            hour_start = bucket_start - bucket_start % HOUR_SECONDS
+
+            if hour_start != self.hour_start:
+                if self.buckets:
+                    result = {
+                        "start": datetime.fromtimestamp(self.hour_start, timezone.utc),
+                        "mean": self.means / self.buckets,
+                        "min": self.min,
+                        "max": self.max,
+                    }
+
+                self.hour_start = hour_start
+                self._reset_hour()
+
+        self.bucket.add(value)
+
+        return result
+
+
+class LeoNtpStatistics:
+    """Aggregate item samples in memory and import them as hourly external statistics."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the statistics importer."""
+        self.hass = hass
+        self.imported = 0
+        self._statistics: dict[str, LeoNtpHourlyStatistic] = {}
+
+    @callback
+    def async_add(self, items: dict[str, LeoNtpItem], now: float) -> None:
+        """Add the samples of a poll taken at Unix time now, importing the hours it completes."""
+        for item_type, unit in STATISTICS_ITEM_TYPES.items():
+            if (item := items.get(item_type)) is None or item.state is None:
+                continue
+
+            if (statistic := self._statistics.get(item.key)) is None:
+                metadata: StatisticMetaData = {
+                    "has_mean": True,
+                    "has_sum": False,
+                    "name": f"{item.device_name} {item.name}",
+                    "source": DOMAIN,
+                    "statistic_id": f"{DOMAIN}:{item.key}",
+                    "unit_of_measurement": unit,
+                }
+                statistic = self._statistics[item.key] = LeoNtpHourlyStatistic(metadata)
+
+            if (data := statistic.add(float(item.state), now)) is None:
+                continue
+
+            # Without the recorder the hour is dropped, the aggregates stay bounded either way.
+            if "recorder" in self.hass.config.components:
+                from homeassistant.components.recorder.statistics import (
+                    async_add_external_statistics,
+                )
+
+                log_debug(
+                    f"[statistics|LeoNtpStatistics|async_add|import] {statistic.metadata['statistic_id']}, {data}"
+                )
+                async_add_external_statistics(self.hass, statistic.metadata, [data])
+                self.imported += 1
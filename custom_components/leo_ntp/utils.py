@@ -4,8 +4,6 @@ from __future__ import annotations
 import logging
 import re
 
-from jsonpath import jsonpath
-
 from .const import SHOW_DEBUG_AS_WARNING
 
 _LOGGER = logging.getLogger(__name__)
@@ -81,6 +79,9 @@ def sizeof_fmt(num, suffix = "b"):
 
 def get_json_dict_path(dictionary, path):
     """Fetch info based on jsonpath from dict."""
+    # Imported on first use, nothing on the polling path needs it.
+    from jsonpath import jsonpath
+
     # log_debug(f"[get_json_dict_path] Path: {path}, Dict: {dictionary}")
     json_dict = jsonpath(dictionary, path)
 
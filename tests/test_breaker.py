@@ -0,0 +1,104 @@
+"""Tests for the LeoNTP circuit breaker."""
+from importlib.util import module_from_spec
+from importlib.util import spec_from_file_location
+from pathlib import Path
+
+# The breaker is pure Python, load it without importing the Home Assistant integration.
+_spec = spec_from_file_location(
+    "leo_ntp_breaker",
+    Path(__file__).parent.parent / "custom_components" / "leo_ntp" / "breaker.py",
+)
+breaker = module_from_spec(_spec)
+_spec.loader.exec_module(breaker)
+
+
+def _open_breaker(now: float = 0.0) -> breaker.LeoNtpCircuitBreaker:
+    """Return a breaker opened by consecutive failures at time now."""
+    circuit = breaker.LeoNtpCircuitBreaker(failure_threshold = 3, base_backoff = 10, max_backoff = 40)
+
+    for _ in range(3):
+        assert circuit.allow(now)
+        circuit.record_failure(now)
+
+    return circuit
+
+
+def test_opens_after_threshold() -> None:
+    """The breaker stays closed below the threshold and opens at it."""
+    circuit = breaker.LeoNtpCircuitBreaker(failure_threshold = 3, base_backoff = 10)
+    circuit.record_failure(0)
+    circuit.record_failure(0)
+    assert circuit.state == breaker.STATE_CLOSED
+
+    circuit.record_failure(0)
+    assert circuit.state == breaker.STATE_OPEN
+    assert not circuit.allow(5)
+    assert circuit.retry_in(5) == 5
+
+
+def test_success_resets_failures() -> None:
+    """A response in between failures starts the count over."""
+    circuit = breaker.LeoNtpCircuitBreaker(failure_threshold = 3)
+    circuit.record_failure(0)
+    circuit.record_failure(0)
+    circuit.record_success(0)
+    circuit.record_failure(0)
+    assert circuit.state == breaker.STATE_CLOSED
+    assert circuit.failures == 1
+
+
+def test_half_open_single_probe() -> None:
+    """Once the backoff has passed exactly one probe goes out."""
+    circuit = _open_breaker()
+    assert circuit.allow(10)
+    assert circuit.state == breaker.STATE_HALF_OPEN
+    assert not circuit.allow(10)
+
+
+def test_probe_success_closes() -> None:
+    """A response to the probe closes the breaker."""
+    circuit = _open_breaker()
+    circuit.allow(10)
+    circuit.record_success(10)
+    assert circuit.state == breaker.STATE_CLOSED
+    assert circuit.failures == 0
+    assert circuit.allow(10)
+
+
+def test_probe_failure_doubles_backoff_up_to_max() -> None:
+    """Every failed probe doubles the backoff, capped at the maximum."""
+    circuit = _open_breaker()
+    now = 0.0
+
+    for backoff in (20, 40, 40):
+        now += circuit.backoff
+        assert circuit.allow(now)
+        circuit.record_failure(now)
+        assert circuit.state == breaker.STATE_OPEN
+        assert circuit.backoff == backoff
+        assert not circuit.allow(now + backoff - 1)
+
+
+def test_aborted_probe_is_retried() -> None:
+    """A cancelled probe reopens the breaker and lets the next poll probe again."""
+    circuit = _open_breaker()
+    assert circuit.allow(10)
+    circuit.record_abort(10)
+    assert circuit.state == breaker.STATE_OPEN
+    assert circuit.backoff == 10
+    assert circuit.allow(10)
+    assert circuit.state == breaker.STATE_HALF_OPEN
+
+
+def test_abort_while_closed_is_ignored() -> None:
+    """A cancelled poll of a closed breaker is not a failure."""
+    circuit = breaker.LeoNtpCircuitBreaker()
+    circuit.record_abort(0)
+    assert circuit.state == breaker.STATE_CLOSED
+    assert circuit.failures == 0
+
+
+def test_time_in_state() -> None:
+    """Time in state counts from the last transition."""
+    circuit = _open_breaker(now = 100)
+    assert circuit.time_in_state(130) == 30
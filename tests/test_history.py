@@ -0,0 +1,39 @@
+"""Tests for the LeoNTP sample history."""
+from importlib.util import module_from_spec
+from importlib.util import spec_from_file_location
+from pathlib import Path
+
+# The history is pure Python, load it without importing the Home Assistant integration.
+_spec = spec_from_file_location(
+    "leo_ntp_history",
+    Path(__file__).parent.parent / "custom_components" / "leo_ntp" / "history.py",
+)
+history = module_from_spec(_spec)
+_spec.loader.exec_module(history)
+
+
+def test_allan_deviation_tau_follows_sample_interval() -> None:
+    """Tau is the averaging factor times the interval the phases were sampled at."""
+    device = history.LeoNtpHistory(size = 16)
+
+    for sample in range(9):
+        device.add(0.001 * (sample % 2), 0.01, 10)
+
+    assert set(device.allan_deviation.deviations()) == {10, 20, 40}
+
+
+def test_allan_deviation_restarts_on_new_interval() -> None:
+    """Phases sampled at another interval are not mixed into the deviation."""
+    device = history.LeoNtpHistory(size = 16)
+
+    for sample in range(9):
+        device.add(0.001 * (sample % 2), 0.01, 10)
+
+    device.add(0.0, 0.01, 20)
+    device.add(0.001, 0.01, 20)
+    assert device.allan_deviation.deviations() == {}
+
+    device.add(0.0, 0.01, 20)
+    assert set(device.allan_deviation.deviations()) == {20}
+    # The offset statistics do not depend on the interval.
+    assert device.offset.count == 12
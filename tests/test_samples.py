@@ -0,0 +1,61 @@
+"""Tests for the LeoNTP sample ring file."""
+from importlib.util import module_from_spec
+from importlib.util import spec_from_file_location
+from pathlib import Path
+
+# The ring file is pure Python, load it without importing the Home Assistant integration.
+_spec = spec_from_file_location(
+    "leo_ntp_samples",
+    Path(__file__).parent.parent / "custom_components" / "leo_ntp" / "samples.py",
+)
+samples = module_from_spec(_spec)
+_spec.loader.exec_module(samples)
+
+
+def _fill(path: Path, capacity: int, count: int) -> None:
+    """Append count samples, timed 0 to count - 1, to a ring file of a capacity."""
+    sample_file = samples.LeoNtpSampleFile(str(path), capacity)
+
+    for sample in range(count):
+        sample_file.append(float(sample), 0.1, 1.0, 9, 1, sample, 100, 50)
+
+    sample_file.close()
+
+
+def _times(path: Path, capacity: int) -> list[float]:
+    """Return the sample times of a ring file opened at a capacity."""
+    sample_file = samples.LeoNtpSampleFile(str(path), capacity)
+    times = [sample.time for sample in sample_file.samples()]
+    sample_file.close()
+    return times
+
+
+def test_reopen_keeps_samples(tmp_path: Path) -> None:
+    """A file reopened at its capacity keeps its ring as is."""
+    path = tmp_path / "1234.samples"
+    _fill(path, 8, 12)
+    assert _times(path, 8) == [float(sample) for sample in range(4, 12)]
+
+
+def test_larger_capacity_keeps_samples(tmp_path: Path) -> None:
+    """A file reopened at a larger capacity keeps all samples and appends after them."""
+    path = tmp_path / "1234.samples"
+    _fill(path, 8, 12)
+    sample_file = samples.LeoNtpSampleFile(str(path), 16)
+    sample_file.append(12.0, 0.1, 1.0, 9, 1, 12, 100, 50)
+    assert [sample.time for sample in sample_file.samples()] == [float(sample) for sample in range(4, 13)]
+    sample_file.close()
+
+
+def test_smaller_capacity_keeps_newest_samples(tmp_path: Path) -> None:
+    """A file reopened at a smaller capacity keeps its newest samples."""
+    path = tmp_path / "1234.samples"
+    _fill(path, 8, 12)
+    assert _times(path, 3) == [9.0, 10.0, 11.0]
+
+
+def test_other_layout_is_reset(tmp_path: Path) -> None:
+    """A file that is not a ring file of this version starts empty."""
+    path = tmp_path / "1234.samples"
+    path.write_bytes(b"\0" * 100)
+    assert _times(path, 8) == []
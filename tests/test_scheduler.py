@@ -0,0 +1,64 @@
+"""Tests for the LeoNTP adaptive poll scheduler."""
+from importlib.util import module_from_spec
+from importlib.util import spec_from_file_location
+from pathlib import Path
+
+# The scheduler is pure Python, load it without importing the Home Assistant integration.
+_spec = spec_from_file_location(
+    "leo_ntp_scheduler",
+    Path(__file__).parent.parent / "custom_components" / "leo_ntp" / "scheduler.py",
+)
+scheduler = module_from_spec(_spec)
+_spec.loader.exec_module(scheduler)
+
+
+def _scheduler() -> scheduler.LeoNtpPollScheduler:
+    """Return an enabled scheduler polling every 10 to 300 seconds."""
+    return scheduler.LeoNtpPollScheduler(min_interval = 10, max_interval = 300, enabled = True)
+
+
+def test_stable_polls_lengthen_interval() -> None:
+    """The interval doubles after every STABLE_POLLS stable polls, up to the maximum."""
+    poll_scheduler = _scheduler()
+
+    for _ in range(10 * scheduler.STABLE_POLLS):
+        interval = poll_scheduler.update(gps_lock = True, satellites = 9, jitter = 0.0005)
+
+    assert interval == 300
+
+
+def test_gradual_jitter_rise_is_unstable() -> None:
+    """Jitter rising a little on every poll does not lengthen the interval."""
+    poll_scheduler = _scheduler()
+    jitter = 0.0005
+    intervals = []
+
+    while jitter < 35:
+        intervals.append(poll_scheduler.update(gps_lock = True, satellites = 9, jitter = jitter))
+        jitter *= 1.8
+
+    assert max(intervals) == 10
+
+
+def test_gradual_satellite_loss_is_unstable() -> None:
+    """Losing one satellite per poll does not lengthen the interval."""
+    poll_scheduler = _scheduler()
+    intervals = [
+        poll_scheduler.update(gps_lock = True, satellites = satellites, jitter = 0.0005)
+        for satellites in range(12, 3, -1)
+    ]
+
+    assert max(intervals) == 10
+
+
+def test_missing_jitter_is_unstable_when_required() -> None:
+    """A failed offset measurement drops back to the minimum interval."""
+    poll_scheduler = _scheduler()
+
+    for _ in range(scheduler.STABLE_POLLS):
+        poll_scheduler.update(gps_lock = True, satellites = 9, jitter = 0.0005)
+
+    assert poll_scheduler.interval == 20
+    assert poll_scheduler.update(gps_lock = True, satellites = 9, jitter = None, jitter_required = True) == 10
+    poll_scheduler.update(gps_lock = True, satellites = 9, jitter = None)
+    assert poll_scheduler._stable_polls == 1